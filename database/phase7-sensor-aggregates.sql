@@ -0,0 +1,35 @@
+-- =====================================================
+-- AgriTrack Phase 7: Sensor Aggregate Functions
+-- =====================================================
+-- This migration adds server-side aggregation used by the AI engine:
+-- 1. Per-machine utilization counts for /efficiency
+--
+-- Returning one row per machine instead of every raw reading keeps
+-- the payload small and avoids PostgREST's row cap truncating the
+-- time window.
+--
+-- Run this in Supabase SQL Editor after phase6-farmers-auth.sql
+
+-- =====================================================
+-- PER-MACHINE EFFICIENCY STATS
+-- Called via supabase.rpc('sensor_efficiency_stats', { p_since })
+-- =====================================================
+CREATE OR REPLACE FUNCTION sensor_efficiency_stats(p_since TIMESTAMPTZ)
+RETURNS TABLE (
+  device_id VARCHAR(100),
+  total_readings BIGINT,
+  active_readings BIGINT,
+  avg_moving_speed DOUBLE PRECISION  -- Mean speed over readings with speed > 0
+) AS $$
+  SELECT
+    s.device_id,
+    COUNT(*) AS total_readings,
+    COUNT(*) FILTER (WHERE s.speed > 1) AS active_readings,
+    AVG(s.speed) FILTER (WHERE s.speed > 0)::DOUBLE PRECISION AS avg_moving_speed
+  FROM sensor_logs s
+  WHERE s.timestamp >= p_since
+  GROUP BY s.device_id
+  ORDER BY s.device_id;
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION sensor_efficiency_stats IS 'Per-machine reading counts and moving speed since p_since, for AI engine efficiency metrics';
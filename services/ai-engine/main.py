@@ -8,21 +8,36 @@ AgriTrack AI Engine v2.0
 
 from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Callable, Awaitable
+from collections import Counter
 import numpy as np
 from sklearn.ensemble import IsolationForest
-from sklearn.linear_model import LinearRegression
 from sklearn.preprocessing import StandardScaler
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from contextlib import nullcontext
+from joblib import parallel_backend
 import os
-from supabase import create_client, Client
+import time
+import asyncio
+from supabase import acreate_client, AsyncClient
+from postgrest.exceptions import APIError
 import pandas as pd
+import orjson
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered by orjson; NumPy scalars and arrays serialize natively"""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
 
 app = FastAPI(
     title="AgriTrack AI Engine",
     description="Anomaly detection, predictive maintenance, and analytics for CRM machinery",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=ORJSONResponse
 )
 
 app.add_middleware(
@@ -34,32 +49,158 @@ app.add_middleware(
 )
 
 # Supabase client
-supabase: Optional[Client] = None
+supabase: Optional[AsyncClient] = None
 
 # ML Models
 anomaly_model: Optional[IsolationForest] = None
 scaler: Optional[StandardScaler] = None
 model_trained_at: Optional[datetime] = None
 
+# Fitted scaler parameters, so inference can standardize without sklearn's per-call validation
+scaler_mean: Optional[np.ndarray] = None
+scaler_scale: Optional[np.ndarray] = None
+
 # In-memory buffer for real-time data (supplement to DB)
-realtime_buffer: List[dict] = []
 MAX_BUFFER_SIZE = 5000
 
+# Most recent readings kept for (re)training the anomaly model
+TRAINING_MAX_ROWS = 10000
+
+# DB-backed summaries requested again within this many seconds reuse the first result
+RESULT_CACHE_SECONDS = 30
+_result_cache: Dict[tuple, asyncio.Future] = {}
+
+# Batches at least this large are scored with the trees spread over all cores;
+# below it the thread dispatch costs more than it saves
+PARALLEL_SCORING_MIN_ROWS = 1000
+
 
-def get_supabase() -> Optional[Client]:
-    """Get or create Supabase client"""
+async def get_supabase() -> Optional[AsyncClient]:
+    """Get or create the async Supabase client (one pooled HTTP session, reused by every request)"""
     global supabase
     if supabase is None:
         url = os.getenv("SUPABASE_URL")
         key = os.getenv("SUPABASE_SERVICE_KEY")
         if url and key:
-            supabase = create_client(url, key)
+            supabase = await acreate_client(url, key)
             print("✅ Connected to Supabase")
         else:
             print("⚠️ Supabase credentials not configured")
     return supabase
 
 
+async def _cached(key: tuple, compute: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Run `compute()` at most once per key per RESULT_CACHE_SECONDS bucket.
+    Callers arriving while it is in flight await the same task, so a burst of
+    identical requests costs one set of DB round trips. Failures are not cached.
+    """
+    bucket = int(time.time() // RESULT_CACHE_SECONDS)
+    key = (*key, bucket)
+    task = _result_cache.get(key)
+    if task is None:
+        for stale in [k for k in _result_cache if k[-1] != bucket]:
+            del _result_cache[stale]
+        task = _result_cache[key] = asyncio.ensure_future(compute())
+
+        def _forget_failure(done: asyncio.Future):
+            if done.cancelled() or done.exception() is not None:
+                _result_cache.pop(key, None)
+        task.add_done_callback(_forget_failure)
+    return await asyncio.shield(task)
+
+
+# ═══════════════════════════════════════════════════════════════════
+# FEATURE HELPERS
+# ═══════════════════════════════════════════════════════════════════
+
+VIB_COLUMNS = ['vibration_x', 'vibration_y', 'vibration_z']
+
+
+def _vib_magnitude(xyz: np.ndarray) -> np.ndarray:
+    """Euclidean vibration magnitude of each (x, y, z) row in one pass"""
+    return np.linalg.norm(xyz, axis=1)
+
+
+def _column(rows: List[dict], field: str) -> np.ndarray:
+    """One numeric field of PostgREST rows as a float64 array (None -> NaN)"""
+    return np.array([r.get(field) for r in rows], dtype=np.float64)
+
+
+def _rows_to_frame(rows: List[dict], numeric: List[str], labels: List[str] = ()) -> pd.DataFrame:
+    """
+    Build a DataFrame from PostgREST rows column by column. Numeric columns are
+    typed float64 up front (None -> NaN), which skips pandas' per-row dict
+    scan and dtype inference and keeps all-null columns numeric.
+    """
+    data = {c: [r.get(c) for r in rows] for c in labels}
+    for c in numeric:
+        data[c] = _column(rows, c)
+    return pd.DataFrame(data)
+
+
+# ═══════════════════════════════════════════════════════════════════
+# REAL-TIME BUFFER
+# ═══════════════════════════════════════════════════════════════════
+
+class SensorRingBuffer:
+    """
+    Fixed-capacity ring of the most recent readings, stored column-wise
+    (one preallocated array per field) so scans are plain NumPy reductions.
+    Machine ids are interned into `ids` and referenced by index.
+    """
+
+    NO_TIMESTAMP = -1
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.ids: List[str] = []
+        self._id_index: Dict[str, int] = {}
+        self.id_idx = np.zeros(capacity, dtype=np.int32)
+        self.timestamp = np.full(capacity, self.NO_TIMESTAMP, dtype=np.int64)
+        self.temp = np.zeros(capacity)
+        self.vib = np.zeros((capacity, 3))
+        self.speed = np.zeros(capacity)
+        self.head = 0  # Total rows ever written; next write slot is head % capacity
+
+    def __len__(self) -> int:
+        return min(self.head, self.capacity)
+
+    def _intern(self, machine_id: str) -> int:
+        idx = self._id_index.get(machine_id)
+        if idx is None:
+            idx = self._id_index[machine_id] = len(self.ids)
+            self.ids.append(machine_id)
+        return idx
+
+    def extend(self, rows: List["SensorData"]):
+        """Append a batch of readings, overwriting the oldest once full"""
+        rows = rows[-self.capacity:]
+        n = len(rows)
+        if n == 0:
+            return
+        slots = (self.head + np.arange(n)) % self.capacity
+        self.id_idx[slots] = [self._intern(r.id) for r in rows]
+        self.timestamp[slots] = [self.NO_TIMESTAMP if r.timestamp is None else r.timestamp for r in rows]
+        # One pass over the models for all numeric fields, then a bulk write per column
+        readings = np.array([(r.temp, r.vib_x, r.vib_y, r.vib_z, r.speed) for r in rows])
+        self.temp[slots] = readings[:, 0]
+        self.vib[slots] = readings[:, 1:4]
+        self.speed[slots] = readings[:, 4]
+        self.head += n
+
+    def window(self, last: Optional[int] = None) -> np.ndarray:
+        """Slot indices of the newest `last` rows (default: all), oldest first"""
+        n = len(self) if last is None else min(last, len(self))
+        return np.arange(self.head - n, self.head) % self.capacity
+
+    def machine_id(self, slot: int) -> str:
+        return self.ids[self.id_idx[slot]]
+
+
+realtime_buffer = SensorRingBuffer(MAX_BUFFER_SIZE)
+
+
 # ═══════════════════════════════════════════════════════════════════
 # MODELS
 # ═══════════════════════════════════════════════════════════════════
@@ -118,7 +259,7 @@ async def root():
 
 @app.get("/health")
 async def health():
-    db_connected = get_supabase() is not None
+    db_connected = (await get_supabase()) is not None
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
@@ -135,16 +276,13 @@ async def health():
 
 @app.post("/ingest")
 async def ingest_data(batch: SensorBatch):
-    """Ingest real-time sensor data for immediate analysis"""
-    global realtime_buffer
+    """
+    Ingest real-time sensor data for immediate analysis. Only the in-memory
+    buffer is written here; sensor_logs rows are persisted by the API's
+    batched writer (apps/api/src/services/database.js).
+    """
+    realtime_buffer.extend(batch.data)
     
-    for data in batch.data:
-        realtime_buffer.append(data.dict())
-        
-    # Trim buffer if too large
-    if len(realtime_buffer) > MAX_BUFFER_SIZE:
-        realtime_buffer = realtime_buffer[-MAX_BUFFER_SIZE:]
-        
     return {"ingested": len(batch.data), "buffer_size": len(realtime_buffer)}
 
 
@@ -152,48 +290,109 @@ async def ingest_data(batch: SensorBatch):
 # MODEL TRAINING (from Database)
 # ═══════════════════════════════════════════════════════════════════
 
+class TrainingWindow:
+    """
+    Feature rows from the last training fetch, oldest first. A retrain over the
+    same or a shorter window only pulls readings from around the newest one held
+    onward and drops those that have aged out; a longer window triggers a full fetch.
+    """
+
+    COLUMNS = 'id, timestamp, temperature, speed, vibration_x, vibration_y, vibration_z'
+    # The API writes readings in timed batches and re-queues failed ones, so a row
+    # can land after newer ones were fetched. Each incremental fetch reaches back
+    # this far behind the newest held reading; rows already held are skipped by id
+    OVERLAP = timedelta(minutes=5)
+
+    def __init__(self, max_rows: int):
+        self.max_rows = max_rows
+        # float32 halves the memory the scaler and tree builder stream over;
+        # IsolationForest converts to float32 internally anyway
+        self.features = np.empty((0, 3), dtype=np.float32)  # temperature, vib_magnitude, speed
+        self.times = np.empty(0, dtype='datetime64[us]')  # UTC
+        self.ids = np.empty(0, dtype=object)
+        self.since: Optional[datetime] = None
+
+    async def _fetch(self, db: AsyncClient, since: datetime) -> List[dict]:
+        query = db.table('sensor_logs').select(self.COLUMNS).gte('timestamp', since.isoformat())
+        rows = (await query.order('timestamp', desc=True).limit(self.max_rows).execute()).data or []
+        return rows[::-1]
+
+    async def refresh(self, db: AsyncClient, since: datetime) -> np.ndarray:
+        """Bring the window up to date for readings since `since` (timezone-aware) and return its features"""
+        incremental = self.since is not None and self.since <= since and len(self.times) > 0
+        fetch_from = since
+        if incremental:
+            newest = pd.Timestamp(self.times[-1]).tz_localize('UTC').to_pydatetime()
+            fetch_from = max(since, newest - self.OVERLAP)
+        rows = await self._fetch(db, fetch_from)
+
+        if incremental:
+            # Skip re-fetched rows from the overlap that the window already holds
+            held = set(self.ids[self.times >= np.datetime64(_utc_naive(fetch_from), 'us')].tolist())
+            rows = [r for r in rows if r['id'] not in held]
+
+        features = np.nan_to_num(np.column_stack([
+            _column(rows, 'temperature'),
+            _vib_magnitude(np.nan_to_num(np.column_stack([_column(rows, c) for c in VIB_COLUMNS]))),
+            _column(rows, 'speed'),
+        ])).astype(np.float32)
+        times = pd.to_datetime([r['timestamp'] for r in rows], utc=True, format='ISO8601') \
+            .tz_localize(None).to_numpy(dtype='datetime64[us]')
+        ids = np.array([r['id'] for r in rows], dtype=object)
+
+        if incremental:
+            features = np.concatenate([self.features, features])
+            times = np.concatenate([self.times, times])
+            ids = np.concatenate([self.ids, ids])
+            # Late rows can be older than ones held; restore time order before trimming
+            order = np.argsort(times, kind='stable')
+            keep = order[times[order] >= np.datetime64(_utc_naive(since), 'us')][-self.max_rows:]
+            features, times, ids = features[keep], times[keep], ids[keep]
+
+        self.features, self.times, self.ids, self.since = features, times, ids, since
+        print(f"📥 Training window: {len(rows)} new rows fetched, {len(features)} held")
+        return features
+
+
+def _utc_naive(moment: datetime) -> datetime:
+    """Timezone-aware datetime as naive UTC, for comparing with the window's datetime64 times"""
+    return moment.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+training_window = TrainingWindow(TRAINING_MAX_ROWS)
+
+
 @app.post("/train")
 async def train_model(hours: int = Query(default=24, description="Hours of historical data to use")):
     """Train anomaly detection model on persisted sensor data from Supabase"""
-    global anomaly_model, scaler, model_trained_at
+    global anomaly_model, scaler, scaler_mean, scaler_scale, model_trained_at
     
-    db = get_supabase()
+    db = await get_supabase()
     if not db:
         raise HTTPException(status_code=503, detail="Database not connected")
     
-    # Fetch historical sensor logs
-    since = (datetime.now() - timedelta(hours=hours)).isoformat()
-    
-    response = db.table('sensor_logs').select('*').gte('timestamp', since).limit(10000).execute()
+    # Top up the cached window with sensor logs we have not fetched yet
+    features = await training_window.refresh(db, datetime.now(timezone.utc) - timedelta(hours=hours))
     
-    if not response.data or len(response.data) < 100:
+    if len(features) < 100:
         raise HTTPException(
             status_code=400, 
-            detail=f"Insufficient data for training. Found {len(response.data) if response.data else 0} records (need 100+)"
+            detail=f"Insufficient data for training. Found {len(features)} records (need 100+)"
         )
     
-    # Convert to DataFrame for easier manipulation
-    df = pd.DataFrame(response.data)
-    
-    # Calculate features
-    df['vib_magnitude'] = np.sqrt(
-        df['vibration_x'].fillna(0)**2 + 
-        df['vibration_y'].fillna(0)**2 + 
-        df['vibration_z'].fillna(0)**2
-    )
-    
-    features = df[['temperature', 'vib_magnitude', 'speed']].fillna(0).values
-    
-    # Scale features
+    # Scale a copy - the window keeps the raw features for the next retrain
     scaler = StandardScaler()
     features_scaled = scaler.fit_transform(features)
+    scaler_mean = scaler.mean_.astype(np.float64)
+    scaler_scale = scaler.scale_.astype(np.float64)
     
     # Train Isolation Forest
     anomaly_model = IsolationForest(
         contamination=0.05,  # Expect 5% anomalies
         random_state=42,
         n_estimators=150,
-        max_samples='auto'
+        max_samples=min(256, len(features)),
+        n_jobs=-1
     )
     anomaly_model.fit(features_scaled)
     model_trained_at = datetime.now()
@@ -212,82 +411,99 @@ async def train_model(hours: int = Query(default=24, description="Hours of histo
 # ANOMALY DETECTION
 # ═══════════════════════════════════════════════════════════════════
 
+# Anomaly codes: 0 = normal, 1-5 = rule ladder in priority order, 6 = ML model
+ANOMALY_TYPES = (None, "overheat_critical", "overheat", "vibration_critical", "vibration", "idle", "ml_detected")
+ANOMALY_SEVERITIES = np.array(["warning", "critical", "warning", "critical", "warning", "info", "warning"], dtype=object)
+ANOMALY_DETAILS = (
+    "",
+    "CRITICAL: Temperature {temp}°C exceeds 100°C",
+    "Temperature {temp}°C exceeds 90°C threshold",
+    "CRITICAL: Vibration {vib:.3f} indicates mechanical failure",
+    "High vibration {vib:.3f} - check machinery",
+    "Machine idle with engine running (speed={speed}, vib={vib:.3f})",
+    "ML model detected unusual pattern (score={score:.3f})",
+)
+ML_DETECTED = 6
+
+
+def _rule_scan(temps: np.ndarray, vib_magnitudes: np.ndarray, speeds: np.ndarray):
+    """Apply the rule ladder to a whole batch; returns (anomaly codes, anomaly scores)"""
+    rules = np.column_stack([
+        temps > 100,                                # Critical: Overheat
+        temps > 90,
+        vib_magnitudes > 0.7,                       # High vibration - potential mechanical failure
+        vib_magnitudes > 0.5,
+        (speeds < 1) & (vib_magnitudes > 0.02),     # Idle detection (REQ-AI-01)
+    ])
+    # argmax picks the first rule that fired, i.e. the ladder's priority order
+    codes = np.where(rules.any(axis=1), rules.argmax(axis=1) + 1, 0)
+
+    # Score of every code for every row, then one lookup by code
+    n = len(temps)
+    candidates = np.column_stack([
+        np.zeros(n), np.ones(n), np.minimum(1.0, (temps - 90) / 30),
+        np.ones(n), np.minimum(1.0, vib_magnitudes / 1.0), np.full(n, 0.3),
+    ])
+    scores = np.take_along_axis(candidates, codes[:, None], axis=1)[:, 0]
+    return codes, scores
+
+
 @app.post("/detect", response_model=List[AnomalyResult])
 async def detect_anomalies(batch: SensorBatch):
     """Detect anomalies in incoming sensor data using rules + ML"""
-    
-    results = []
-    
-    for data in batch.data:
-        vib_magnitude = np.sqrt(data.vib_x**2 + data.vib_y**2 + data.vib_z**2)
-        
-        # Rule-based detection (always active)
-        is_anomaly = False
-        anomaly_type = None
-        details = ""
-        anomaly_score = 0.0
-        severity = "warning"
-        
-        # Critical: Overheat
-        if data.temp > 100:
-            is_anomaly = True
-            anomaly_type = "overheat_critical"
-            details = f"CRITICAL: Temperature {data.temp}°C exceeds 100°C"
-            anomaly_score = 1.0
-            severity = "critical"
-        elif data.temp > 90:
-            is_anomaly = True
-            anomaly_type = "overheat"
-            details = f"Temperature {data.temp}°C exceeds 90°C threshold"
-            anomaly_score = min(1.0, (data.temp - 90) / 30)
-            severity = "warning"
-            
-        # High vibration - potential mechanical failure
-        elif vib_magnitude > 0.7:
-            is_anomaly = True
-            anomaly_type = "vibration_critical"
-            details = f"CRITICAL: Vibration {vib_magnitude:.3f} indicates mechanical failure"
-            anomaly_score = 1.0
-            severity = "critical"
-        elif vib_magnitude > 0.5:
-            is_anomaly = True
-            anomaly_type = "vibration"
-            details = f"High vibration {vib_magnitude:.3f} - check machinery"
-            anomaly_score = min(1.0, vib_magnitude / 1.0)
-            severity = "warning"
-            
-        # Idle detection (REQ-AI-01)
-        elif data.speed < 1 and vib_magnitude > 0.02:
-            is_anomaly = True
-            anomaly_type = "idle"
-            details = f"Machine idle with engine running (speed={data.speed}, vib={vib_magnitude:.3f})"
-            anomaly_score = 0.3
-            severity = "info"
-            
-        # ML-based detection (if model trained)
-        if anomaly_model is not None and scaler is not None and not is_anomaly:
-            features = np.array([[data.temp, vib_magnitude, data.speed]])
-            features_scaled = scaler.transform(features)
-            prediction = anomaly_model.predict(features_scaled)[0]
-            score = -anomaly_model.score_samples(features_scaled)[0]
-            
-            if prediction == -1:  # Anomaly
-                is_anomaly = True
-                anomaly_type = "ml_detected"
-                anomaly_score = min(1.0, score / 0.5)  # Normalize score
-                details = f"ML model detected unusual pattern (score={score:.3f})"
-                severity = "warning" if score < 0.3 else "critical"
-                
-        results.append(AnomalyResult(
-            machine_id=data.id,
-            is_anomaly=is_anomaly,
-            anomaly_score=round(anomaly_score, 3),
-            anomaly_type=anomaly_type,
-            details=details,
-            severity=severity
-        ))
-        
-    return results
+
+    if not batch.data:
+        return []
+
+    # One (N, 5) matrix for the whole batch: temp, vib_x, vib_y, vib_z, speed
+    readings = np.array([[d.temp, d.vib_x, d.vib_y, d.vib_z, d.speed] for d in batch.data])
+    temps = readings[:, 0]
+    speeds = readings[:, 4]
+    vib_magnitudes = _vib_magnitude(readings[:, 1:4])
+
+    # Rule-based detection (always active)
+    codes, anomaly_scores = _rule_scan(temps, vib_magnitudes, speeds)
+    severities = ANOMALY_SEVERITIES[codes]
+
+    # ML-based detection (if model trained) on the rows no rule flagged, in a single call
+    ml_scores = np.zeros(len(readings))
+    if anomaly_model is not None and scaler_mean is not None:
+        ml_rows = np.flatnonzero(codes == 0)
+        if len(ml_rows):
+            features = np.column_stack([temps, vib_magnitudes, speeds])[ml_rows]
+            features_scaled = (features - scaler_mean) / scaler_scale
+            parallel = len(ml_rows) >= PARALLEL_SCORING_MIN_ROWS
+            with parallel_backend("threading", n_jobs=-1) if parallel else nullcontext():
+                scores = -anomaly_model.score_samples(features_scaled)
+
+            # Same decision as predict() == -1 (score_samples < offset_), without a second pass over the trees
+            outliers = scores > -anomaly_model.offset_
+            flagged = ml_rows[outliers]  # Anomaly
+            ml_scores[flagged] = scores[outliers]
+            codes[flagged] = ML_DETECTED
+            anomaly_scores[flagged] = np.minimum(1.0, ml_scores[flagged] / 0.5)  # Normalize score
+            severities[flagged] = np.where(ml_scores[flagged] < 0.3, "warning", "critical")
+
+    # Plain dicts returned as a Response skip the per-row AnomalyResult validation
+    # and re-serialization; response_model still documents the shape
+    results = [None] * len(batch.data)
+    for i, (data, code, score, severity, vib_magnitude, ml_score) in enumerate(zip(
+        batch.data, codes.tolist(), anomaly_scores.tolist(), severities, vib_magnitudes, ml_scores
+    )):
+        details = ANOMALY_DETAILS[code].format(
+            temp=data.temp, speed=data.speed, vib=vib_magnitude, score=ml_score
+        ) if code else ""
+
+        results[i] = {
+            "machine_id": data.id,
+            "is_anomaly": code != 0,
+            "anomaly_score": round(score, 3),
+            "anomaly_type": ANOMALY_TYPES[code],
+            "details": details,
+            "severity": severity
+        }
+
+    return ORJSONResponse(results)
 
 
 @app.get("/anomalies")
@@ -297,14 +513,14 @@ async def get_anomalies_from_db(
 ):
     """Get anomalies from persisted alerts in database"""
     
-    db = get_supabase()
+    db = await get_supabase()
     if not db:
         # Fallback to buffer
         return _get_anomalies_from_buffer()
     
     since = (datetime.now() - timedelta(hours=hours)).isoformat()
     
-    response = db.table('alerts').select(
+    response = await db.table('alerts').select(
         '*, machine:machines(device_id, name, type)'
     ).gte('created_at', since).order('created_at', desc=True).limit(limit).execute()
     
@@ -318,18 +534,23 @@ async def get_anomalies_from_db(
 
 def _get_anomalies_from_buffer():
     """Fallback: Get anomalies from in-memory buffer"""
+    buf = realtime_buffer
+    slots = buf.window(500)
+    temps = buf.temp[slots]
+    vib_magnitudes = _vib_magnitude(buf.vib[slots])
+    hits = np.flatnonzero((temps > 90) | (vib_magnitudes > 0.5))
+    
     anomalies = []
-    for data in realtime_buffer[-500:]:
-        vib_magnitude = np.sqrt(data.get('vib_x', 0)**2 + data.get('vib_y', 0)**2 + data.get('vib_z', 0)**2)
-        if data.get('temp', 0) > 90 or vib_magnitude > 0.5:
-            anomalies.append({
-                "machine_id": data.get('id'),
-                "temp": data.get('temp'),
-                "vibration": round(vib_magnitude, 4),
-                "timestamp": data.get('timestamp'),
-                "type": "overheat" if data.get('temp', 0) > 90 else "vibration"
-            })
-    return {"anomalies": anomalies[-50:], "total": len(anomalies), "source": "buffer"}
+    for i in hits[-50:]:
+        timestamp = int(buf.timestamp[slots[i]])
+        anomalies.append({
+            "machine_id": buf.machine_id(slots[i]),
+            "temp": float(temps[i]),
+            "vibration": round(float(vib_magnitudes[i]), 4),
+            "timestamp": None if timestamp == buf.NO_TIMESTAMP else timestamp,
+            "type": "overheat" if temps[i] > 90 else "vibration"
+        })
+    return {"anomalies": anomalies, "total": len(hits), "source": "buffer"}
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -342,45 +563,42 @@ async def predict_maintenance(
 ):
     """Predict maintenance needs based on historical sensor trends"""
     
-    db = get_supabase()
+    db = await get_supabase()
     if not db:
         raise HTTPException(status_code=503, detail="Database required for predictions")
     
     # Get last 7 days of sensor data
     since = (datetime.now() - timedelta(days=7)).isoformat()
     
-    query = db.table('sensor_logs').select('*').gte('timestamp', since)
+    query = db.table('sensor_logs').select(
+        'device_id, temperature, vibration_x, vibration_y, vibration_z'
+    ).gte('timestamp', since)
     if machine_id:
         query = query.eq('device_id', machine_id)
     
-    response = query.order('timestamp', desc=False).limit(5000).execute()
+    response = await query.order('timestamp', desc=False).limit(5000).execute()
     
     if not response.data:
         return []
     
-    df = pd.DataFrame(response.data)
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-    df['vib_magnitude'] = np.sqrt(
-        df['vibration_x'].fillna(0)**2 + 
-        df['vibration_y'].fillna(0)**2 + 
-        df['vibration_z'].fillna(0)**2
-    )
+    df = _rows_to_frame(response.data, ['temperature'] + VIB_COLUMNS, labels=['device_id'])
+    df['vib_magnitude'] = _vib_magnitude(df[VIB_COLUMNS].fillna(0).to_numpy())
+    
+    # Convert once; each machine's readings are then a row slice of this matrix
+    features = df[['temperature', 'vib_magnitude']].to_numpy(np.float64, na_value=np.nan)
     
     alerts = []
     
-    # Analyze each machine
-    for device_id in df['device_id'].unique():
-        machine_df = df[df['device_id'] == device_id].copy()
-        
-        if len(machine_df) < 20:
+    # Analyze each machine (groups keep first-seen order, rows keep time order)
+    for device_id, rows in df.groupby('device_id', sort=False).indices.items():
+        if len(rows) < 20:
             continue
         
-        # Calculate time-based index for trend analysis
-        machine_df['time_idx'] = range(len(machine_df))
+        machine_features = features[rows]
         
         # Analyze temperature trend
         temp_alert = _analyze_trend(
-            machine_df, 'temperature', device_id,
+            machine_features[:, 0], device_id,
             warning_threshold=80, critical_threshold=95,
             component="Cooling System"
         )
@@ -389,7 +607,7 @@ async def predict_maintenance(
         
         # Analyze vibration trend
         vib_alert = _analyze_trend(
-            machine_df, 'vib_magnitude', device_id,
+            machine_features[:, 1], device_id,
             warning_threshold=0.3, critical_threshold=0.5,
             component="Mechanical Components"
         )
@@ -399,23 +617,26 @@ async def predict_maintenance(
     return alerts
 
 
-def _analyze_trend(df: pd.DataFrame, column: str, device_id: str, 
+def _trend_slope(values: np.ndarray) -> float:
+    """Least-squares slope of values against their reading index (0..n-1), in closed form"""
+    n = len(values)
+    sum_x = (n - 1) * n / 2
+    sum_xx = (n - 1) * n * (2 * n - 1) / 6
+    sum_xy = np.dot(np.arange(n, dtype=np.float64), values)
+    return (n * sum_xy - sum_x * values.sum()) / (n * sum_xx - sum_x * sum_x)
+
+
+def _analyze_trend(values: np.ndarray, device_id: str, 
                    warning_threshold: float, critical_threshold: float,
                    component: str) -> Optional[MaintenanceAlert]:
     """Analyze trend for a specific metric and predict maintenance needs"""
     
-    values = df[column].dropna().values
+    values = values[~np.isnan(values)]
     if len(values) < 10:
         return None
     
     # Calculate trend using linear regression
-    X = np.arange(len(values)).reshape(-1, 1)
-    y = values
-    
-    model = LinearRegression()
-    model.fit(X, y)
-    
-    slope = model.coef_[0]
+    slope = _trend_slope(values)
     current_value = values[-1]
     avg_value = np.mean(values[-20:])  # Recent average
     
@@ -466,31 +687,31 @@ async def predict_temperature(
 ):
     """Predict future temperature for a specific machine"""
     
-    db = get_supabase()
+    db = await get_supabase()
     if not db:
         raise HTTPException(status_code=503, detail="Database required")
     
     # Get recent data
     since = (datetime.now() - timedelta(hours=24)).isoformat()
-    response = db.table('sensor_logs').select(
-        'temperature, timestamp'
+    response = await db.table('sensor_logs').select(
+        'temperature'
     ).eq('device_id', machine_id).gte('timestamp', since).order('timestamp').execute()
     
     if not response.data or len(response.data) < 20:
         raise HTTPException(status_code=400, detail="Insufficient data for prediction")
     
-    df = pd.DataFrame(response.data)
-    temps = df['temperature'].dropna().values
+    temps = _column(response.data, 'temperature')
+    temps = temps[~np.isnan(temps)]
+    if len(temps) < 2:
+        raise HTTPException(status_code=400, detail="Insufficient data for prediction")
     
-    # Simple linear prediction
-    X = np.arange(len(temps)).reshape(-1, 1)
-    model = LinearRegression()
-    model.fit(X, temps)
+    # Simple linear prediction: closed-form least-squares line through (index, temp)
+    slope = _trend_slope(temps)
+    intercept = temps.mean() - slope * (len(temps) - 1) / 2
     
     # Predict future
     steps_ahead = int(hours_ahead * 720)  # ~720 readings per hour at 5s interval
-    future_X = np.array([[len(temps) + steps_ahead]])
-    predicted_temp = model.predict(future_X)[0]
+    predicted_temp = intercept + slope * (len(temps) + steps_ahead)
     
     # Calculate confidence based on variance
     variance = np.var(temps[-100:]) if len(temps) > 100 else np.var(temps)
@@ -516,46 +737,45 @@ async def get_efficiency_metrics(
 ):
     """Calculate efficiency metrics from persisted sensor data"""
     
-    db = get_supabase()
+    db = await get_supabase()
     
     if db:
-        return await _efficiency_from_db(db, hours)
+        return await _cached(('efficiency', hours), lambda: _efficiency_from_db(db, hours))
     else:
         return _efficiency_from_buffer()
 
 
-async def _efficiency_from_db(db: Client, hours: int):
+async def _efficiency_from_db(db: AsyncClient, hours: int):
     """Calculate efficiency from database"""
     
     since = (datetime.now() - timedelta(hours=hours)).isoformat()
     
-    response = db.table('sensor_logs').select(
-        'device_id, speed, state, timestamp'
-    ).gte('timestamp', since).execute()
+    try:
+        # One pre-aggregated row per machine (database/phase7-sensor-aggregates.sql)
+        machine_stats = (await db.rpc('sensor_efficiency_stats', {'p_since': since}).execute()).data
+    except APIError:
+        # Aggregate function not installed - aggregate the raw readings here
+        response = await db.table('sensor_logs').select('device_id, speed').gte('timestamp', since).execute()
+        machine_stats = _aggregate_efficiency_stats(response.data or [])
     
-    if not response.data:
+    if not machine_stats:
         return {"message": "No data available", "source": "database"}
     
-    df = pd.DataFrame(response.data)
-    
-    # Group by machine
     efficiencies = []
-    for device_id in df['device_id'].unique():
-        machine_df = df[df['device_id'] == device_id]
-        
-        total_readings = len(machine_df)
-        active_readings = len(machine_df[machine_df['speed'] > 1])
+    for stats in machine_stats:
+        total_readings = stats['total_readings']
+        active_readings = stats['active_readings']
         
         if total_readings > 0:
             efficiency = (active_readings / total_readings) * 100
             
             # Estimate distance (speed * time interval)
-            avg_speed = machine_df[machine_df['speed'] > 0]['speed'].mean()
+            avg_speed = stats['avg_moving_speed']
             estimated_hours = total_readings * 5 / 3600  # 5s per reading
-            distance = avg_speed * estimated_hours if not np.isnan(avg_speed) else 0
+            distance = avg_speed * estimated_hours if avg_speed is not None else 0
             
             efficiencies.append({
-                "machine_id": device_id,
+                "machine_id": stats['device_id'],
                 "efficiency": round(efficiency, 1),
                 "active_readings": active_readings,
                 "total_readings": total_readings,
@@ -578,25 +798,52 @@ async def _efficiency_from_db(db: Client, hours: int):
     }
 
 
+def _aggregate_efficiency_stats(rows: List[dict]) -> List[dict]:
+    """Client-side equivalent of the sensor_efficiency_stats RPC"""
+    if not rows:
+        return []
+    
+    df = _rows_to_frame(rows, ['speed'], labels=['device_id'])
+    
+    # One hashed grouping pass, machines in first-seen order
+    speed = df['speed']
+    by_machine = df['device_id']
+    grouped = pd.DataFrame({
+        "total_readings": speed.groupby(by_machine, sort=False).size(),
+        "active_readings": (speed > 1).groupby(by_machine, sort=False).sum(),
+        "avg_moving_speed": speed.where(speed > 0).groupby(by_machine, sort=False).mean(),
+    })
+    
+    return [
+        {
+            "device_id": device_id,
+            "total_readings": int(total),
+            "active_readings": int(active),
+            "avg_moving_speed": None if np.isnan(avg_speed) else avg_speed
+        }
+        for device_id, total, active, avg_speed in zip(
+            grouped.index, grouped['total_readings'], grouped['active_readings'], grouped['avg_moving_speed']
+        )
+    ]
+
+
 def _efficiency_from_buffer():
     """Fallback efficiency calculation from buffer"""
     if len(realtime_buffer) < 10:
         return {"message": "Insufficient data", "source": "buffer"}
     
-    machine_data = {}
-    for data in realtime_buffer:
-        mid = data.get('id')
-        if mid not in machine_data:
-            machine_data[mid] = {"active": 0, "total": 0}
-        machine_data[mid]["total"] += 1
-        if data.get('speed', 0) > 1:
-            machine_data[mid]["active"] += 1
+    slots = realtime_buffer.window()
+    id_idx = realtime_buffer.id_idx[slots]
+    num_ids = len(realtime_buffer.ids)
+    totals = np.bincount(id_idx, minlength=num_ids)
+    actives = np.bincount(id_idx, weights=realtime_buffer.speed[slots] > 1, minlength=num_ids)
     
+    # Report machines in order of first appearance in the buffer
+    present, first_seen = np.unique(id_idx, return_index=True)
     efficiencies = []
-    for mid, stats in machine_data.items():
-        if stats["total"] > 0:
-            eff = (stats["active"] / stats["total"]) * 100
-            efficiencies.append({"machine_id": mid, "efficiency": round(eff, 1)})
+    for mid in present[np.argsort(first_seen)]:
+        eff = (actives[mid] / totals[mid]) * 100
+        efficiencies.append({"machine_id": realtime_buffer.ids[mid], "efficiency": round(float(eff), 1)})
     
     efficiencies.sort(key=lambda x: x["efficiency"], reverse=True)
     avg = np.mean([e["efficiency"] for e in efficiencies]) if efficiencies else 0
@@ -613,76 +860,82 @@ def _efficiency_from_buffer():
 async def get_stats(hours: int = Query(default=24)):
     """Get comprehensive statistics from database"""
     
-    db = get_supabase()
+    db = await get_supabase()
     
     if db:
-        since = (datetime.now() - timedelta(hours=hours)).isoformat()
-        response = db.table('sensor_logs').select('*').gte('timestamp', since).limit(5000).execute()
-        
-        if response.data:
-            df = pd.DataFrame(response.data)
-            
-            temps = df['temperature'].dropna()
-            speeds = df['speed'].dropna()
-            df['vib_mag'] = np.sqrt(
-                df['vibration_x'].fillna(0)**2 + 
-                df['vibration_y'].fillna(0)**2 + 
-                df['vibration_z'].fillna(0)**2
-            )
-            vibs = df['vib_mag']
-            
-            # Get alert counts
-            alert_response = db.table('alerts').select('type').gte('created_at', since).execute()
-            alert_counts = {}
-            if alert_response.data:
-                for alert in alert_response.data:
-                    t = alert.get('type', 'unknown')
-                    alert_counts[t] = alert_counts.get(t, 0) + 1
-            
-            return {
-                "records_analyzed": len(df),
-                "unique_machines": df['device_id'].nunique(),
-                "time_range_hours": hours,
-                "temperature": {
-                    "min": round(temps.min(), 1) if len(temps) else 0,
-                    "max": round(temps.max(), 1) if len(temps) else 0,
-                    "avg": round(temps.mean(), 1) if len(temps) else 0,
-                    "std": round(temps.std(), 2) if len(temps) else 0
-                },
-                "speed": {
-                    "min": round(speeds.min(), 1) if len(speeds) else 0,
-                    "max": round(speeds.max(), 1) if len(speeds) else 0,
-                    "avg": round(speeds.mean(), 1) if len(speeds) else 0
-                },
-                "vibration": {
-                    "min": round(vibs.min(), 4) if len(vibs) else 0,
-                    "max": round(vibs.max(), 4) if len(vibs) else 0,
-                    "avg": round(vibs.mean(), 4) if len(vibs) else 0
-                },
-                "alerts": alert_counts,
-                "model_trained": anomaly_model is not None,
-                "source": "database"
-            }
+        stats = await _cached(('stats', hours), lambda: _stats_from_db(db, hours))
+        if stats:
+            return {**stats, "model_trained": anomaly_model is not None}
     
     # Fallback to buffer
     return _stats_from_buffer()
 
 
+async def _stats_from_db(db: AsyncClient, hours: int) -> Optional[dict]:
+    """Summary statistics over the sensor logs of the last `hours` hours (None if there are none)"""
+    
+    since = (datetime.now() - timedelta(hours=hours)).isoformat()
+    response = await db.table('sensor_logs').select(
+        'device_id, temperature, speed, vibration_x, vibration_y, vibration_z'
+    ).gte('timestamp', since).limit(5000).execute()
+    
+    rows = response.data
+    if not rows:
+        return None
+    
+    # Plain arrays are enough for these reductions - no DataFrame needed
+    temps = _column(rows, 'temperature')
+    temps = temps[~np.isnan(temps)]
+    speeds = _column(rows, 'speed')
+    speeds = speeds[~np.isnan(speeds)]
+    vibs = _vib_magnitude(np.nan_to_num(np.column_stack([_column(rows, c) for c in VIB_COLUMNS])))
+    
+    # Get alert counts
+    alert_response = await db.table('alerts').select('type').gte('created_at', since).execute()
+    alert_counts = _count_by_field(alert_response.data or [], 'type')
+    
+    return {
+        "records_analyzed": len(rows),
+        "unique_machines": len({r.get('device_id') for r in rows} - {None}),
+        "time_range_hours": hours,
+        "temperature": {
+            "min": round(temps.min(), 1) if len(temps) else 0,
+            "max": round(temps.max(), 1) if len(temps) else 0,
+            "avg": round(temps.mean(), 1) if len(temps) else 0,
+            "std": round(temps.std(ddof=1), 2) if len(temps) > 1 else 0
+        },
+        "speed": {
+            "min": round(speeds.min(), 1) if len(speeds) else 0,
+            "max": round(speeds.max(), 1) if len(speeds) else 0,
+            "avg": round(speeds.mean(), 1) if len(speeds) else 0
+        },
+        "vibration": {
+            "min": round(vibs.min(), 4) if len(vibs) else 0,
+            "max": round(vibs.max(), 4) if len(vibs) else 0,
+            "avg": round(vibs.mean(), 4) if len(vibs) else 0
+        },
+        "alerts": alert_counts,
+        "model_trained": anomaly_model is not None,
+        "source": "database"
+    }
+    
+
 def _stats_from_buffer():
     """Fallback stats from buffer"""
     if not realtime_buffer:
         return {"message": "No data available", "source": "buffer"}
     
-    temps = [d.get('temp', 0) for d in realtime_buffer]
-    speeds = [d.get('speed', 0) for d in realtime_buffer]
-    vibs = [np.sqrt(d.get('vib_x', 0)**2 + d.get('vib_y', 0)**2 + d.get('vib_z', 0)**2) for d in realtime_buffer]
+    slots = realtime_buffer.window()
+    temps = realtime_buffer.temp[slots]
+    speeds = realtime_buffer.speed[slots]
+    vibs = _vib_magnitude(realtime_buffer.vib[slots])
     
     return {
         "buffer_size": len(realtime_buffer),
-        "unique_machines": len(set(d.get('id') for d in realtime_buffer)),
-        "temperature": {"min": round(min(temps), 1), "max": round(max(temps), 1), "avg": round(np.mean(temps), 1)},
-        "speed": {"min": round(min(speeds), 1), "max": round(max(speeds), 1), "avg": round(np.mean(speeds), 1)},
-        "vibration": {"min": round(min(vibs), 4), "max": round(max(vibs), 4), "avg": round(np.mean(vibs), 4)},
+        "unique_machines": len(np.unique(realtime_buffer.id_idx[slots])),
+        "temperature": {"min": round(temps.min(), 1), "max": round(temps.max(), 1), "avg": round(temps.mean(), 1)},
+        "speed": {"min": round(speeds.min(), 1), "max": round(speeds.max(), 1), "avg": round(speeds.mean(), 1)},
+        "vibration": {"min": round(vibs.min(), 4), "max": round(vibs.max(), 4), "avg": round(vibs.mean(), 4)},
         "model_trained": anomaly_model is not None,
         "source": "buffer"
     }
@@ -699,36 +952,34 @@ async def get_machine_insights(
 ):
     """Get comprehensive insights for a specific machine"""
     
-    db = get_supabase()
+    db = await get_supabase()
     if not db:
         raise HTTPException(status_code=503, detail="Database required")
     
     since = (datetime.now() - timedelta(days=days)).isoformat()
     
-    # Get machine info first
-    machine_response = db.table('machines').select('*').eq('device_id', machine_id).single().execute()
-    
-    # Get sensor data
-    sensor_response = db.table('sensor_logs').select('*').eq(
-        'device_id', machine_id
-    ).gte('timestamp', since).order('timestamp').execute()
+    # Get machine info and sensor data concurrently
+    machine_response, sensor_response = await asyncio.gather(
+        db.table('machines').select('*').eq('device_id', machine_id).single().execute(),
+        db.table('sensor_logs').select(
+            'temperature, speed, vibration_x, vibration_y, vibration_z'
+        ).eq(
+            'device_id', machine_id
+        ).gte('timestamp', since).order('timestamp').execute()
+    )
     
     # Get alerts using machine UUID if available
     alert_response = None
     if machine_response.data:
-        alert_response = db.table('alerts').select('*').eq(
+        alert_response = await db.table('alerts').select('*').eq(
             'machine_id', machine_response.data['id']
         ).gte('created_at', since).execute()
     
     if not sensor_response.data:
         raise HTTPException(status_code=404, detail=f"No data found for machine {machine_id}")
     
-    df = pd.DataFrame(sensor_response.data)
-    df['vib_magnitude'] = np.sqrt(
-        df['vibration_x'].fillna(0)**2 + 
-        df['vibration_y'].fillna(0)**2 + 
-        df['vibration_z'].fillna(0)**2
-    )
+    df = _rows_to_frame(sensor_response.data, ['temperature', 'speed'] + VIB_COLUMNS)
+    df['vib_magnitude'] = _vib_magnitude(df[VIB_COLUMNS].fillna(0).to_numpy())
     
     # Calculate insights
     total_readings = len(df)
@@ -788,45 +1039,44 @@ async def get_machine_insights(
 async def get_fleet_overview():
     """Get overview of entire fleet health and status"""
     
-    db = get_supabase()
+    db = await get_supabase()
     if not db:
         raise HTTPException(status_code=503, detail="Database required")
     
-    # Get all machines
-    machines_response = db.table('machines').select('*').execute()
+    return await _cached(('fleet_overview',), lambda: _fleet_overview_from_db(db))
+
+
+async def _fleet_overview_from_db(db: AsyncClient):
+    """Fleet status, alert and activity counts over the last 24 hours"""
     
-    # Get recent alerts (last 24 hours)
+    # Machines, recent alerts and recent sensor data (last 24 hours), fetched concurrently
     since = (datetime.now() - timedelta(hours=24)).isoformat()
-    alerts_response = db.table('alerts').select('machine_id, type, severity').gte('created_at', since).execute()
-    
-    # Get recent sensor data summary
-    sensor_response = db.table('sensor_logs').select(
-        'device_id, temperature, speed'
-    ).gte('timestamp', since).execute()
+    machines_response, alerts_response, sensor_response = await asyncio.gather(
+        db.table('machines').select('status, type').execute(),
+        db.table('alerts').select('machine_id, type, severity').gte('created_at', since).execute(),
+        db.table('sensor_logs').select(
+            'device_id, speed'
+        ).gte('timestamp', since).execute()
+    )
     
     machines = machines_response.data or []
     alerts = alerts_response.data or []
     sensors = sensor_response.data or []
     
-    # Count alerts by machine
-    alert_counts = {}
-    critical_machines = set()
-    for alert in alerts:
-        mid = alert.get('machine_id')
-        alert_counts[mid] = alert_counts.get(mid, 0) + 1
-        if alert.get('severity') == 'critical':
-            critical_machines.add(mid)
+    # Machines with any / critical alerts
+    alerted_machines = {alert.get('machine_id') for alert in alerts}
+    critical_machines = {alert.get('machine_id') for alert in alerts if alert.get('severity') == 'critical'}
     
     # Calculate active machines
     active_devices = set()
     if sensors:
-        df = pd.DataFrame(sensors)
+        df = _rows_to_frame(sensors, ['speed'], labels=['device_id'])
         active_devices = set(df[df['speed'] > 1]['device_id'].unique())
     
     return {
         "total_machines": len(machines),
         "active_machines": len(active_devices),
-        "machines_with_alerts": len(alert_counts),
+        "machines_with_alerts": len(alerted_machines),
         "critical_alerts": len(critical_machines),
         "total_alerts_24h": len(alerts),
         "fleet_health": "Good" if len(critical_machines) == 0 else "At Risk" if len(critical_machines) < 3 else "Critical",
@@ -838,11 +1088,7 @@ async def get_fleet_overview():
 
 def _count_by_field(items: List[dict], field: str) -> Dict[str, int]:
     """Count items by a specific field"""
-    counts = {}
-    for item in items:
-        val = item.get(field, 'unknown')
-        counts[val] = counts.get(val, 0) + 1
-    return counts
+    return dict(Counter(item.get(field, 'unknown') for item in items))
 
 
 # ═══════════════════════════════════════════════════════════════════
@@ -852,7 +1098,7 @@ def _count_by_field(items: List[dict], field: str) -> Dict[str, int]:
 @app.on_event("startup")
 async def startup():
     """Initialize on startup"""
-    get_supabase()
+    await get_supabase()
     print("🤖 AgriTrack AI Engine v2.0 started")
     print("   - Anomaly Detection: Rule-based + ML (Isolation Forest)")
     print("   - Predictive Maintenance: Trend Analysis")
@@ -28,9 +28,13 @@ For Punjab/Haryana rice (Kharif season):
 
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import repeat
 from typing import List, Dict, Optional
-import json
+import orjson
+import os
+import sys
 
 
 class HarvestPredictor:
@@ -48,16 +52,296 @@ class HarvestPredictor:
     # Minimum days of data required for reliable prediction
     MIN_DATA_DAYS = 7
     
+    # Status vocabulary as an object array, so every prediction with the same
+    # status shares one str object (a '<U' array makes a new str per element)
+    STATUSES = np.array(["PREDICTED", "HARVEST_READY", "NOT_DECLINING"], dtype=object)
+    
+    # Priority score lookup tables: a value <= BINS[k] (and above BINS[k-1])
+    # earns POINTS[k]; values above the last bin earn POINTS[-1]
+    NDVI_BINS = np.array([0.35, 0.45, 0.55, 0.65])      # Very close / near / approaching / still growing
+    NDVI_POINTS = np.array([4, 3, 2, 1, 0])
+    RATE_BINS = np.array([-0.02, -0.015, -0.01])        # Rapid / moderate / slow decline
+    RATE_POINTS = np.array([3, 2, 1, 0])
+    DAYS_BINS = np.array([3, 7, 14])                     # Imminent / soon / upcoming
+    DAYS_POINTS = np.array([3, 2, 1, 0])
+    
     def __init__(self, ndvi_data: pd.DataFrame):
         """
         Initialize the predictor with NDVI time-series data.
         
+        The frame is read once into one NumPy array per column (see
+        from_arrays); nothing after construction goes through pandas.
+        
         Args:
             ndvi_data: DataFrame with columns [date, district_id, district_name, state, lat, lon, ndvi]
         """
-        self.ndvi_data = ndvi_data.copy()
-        self.ndvi_data['date'] = pd.to_datetime(self.ndvi_data['date'])
+        self._load_arrays(
+            district_id=ndvi_data['district_id'].to_numpy(),
+            date=pd.to_datetime(ndvi_data['date']).to_numpy(),
+            ndvi=ndvi_data['ndvi'].to_numpy(),
+            district_name=ndvi_data['district_name'].to_numpy(),
+            state=ndvi_data['state'].to_numpy(),
+            lat=ndvi_data['lat'].to_numpy(),
+            lon=ndvi_data['lon'].to_numpy()
+        )
+    
+    @classmethod
+    def from_arrays(
+        cls,
+        district_id: np.ndarray,
+        date: np.ndarray,
+        ndvi: np.ndarray,
+        district_name: np.ndarray,
+        state: np.ndarray,
+        lat: np.ndarray,
+        lon: np.ndarray
+    ) -> "HarvestPredictor":
+        """
+        Create a predictor from per-column arrays, one entry per observation.
+        
+        Args:
+            district_id: District identifier of each observation
+            date: Observation dates (datetime64 or ISO date strings)
+            ndvi: NDVI value of each observation
+            district_name, state, lat, lon: District attributes of each observation
+            
+        Returns:
+            HarvestPredictor over the given observations
+        """
+        predictor = cls.__new__(cls)
+        predictor._load_arrays(
+            district_id=np.asarray(district_id),
+            date=np.asarray(date, dtype='datetime64[ns]'),
+            ndvi=np.asarray(ndvi),
+            district_name=np.asarray(district_name),
+            state=np.asarray(state),
+            lat=np.asarray(lat),
+            lon=np.asarray(lon)
+        )
+        return predictor
+    
+    def _load_arrays(self, district_id, date, ndvi, district_name, state, lat, lon):
+        """
+        Sort the observations once and fit the NDVI-vs-day regression for every district.
+        
+        Rows are ordered by (district_id, date) so each district is a contiguous
+        run; the least-squares sums for all districts are then per-run
+        reductions (np.add.reduceat) instead of one mask, sort and polyfit per
+        district. The per-district arrays built here back every later lookup.
+        """
+        self.predictions = {}
+        self._predictions_cache = None  # (reference date, predictions) of the last full run
+        
+        # Integer district codes (in sorted id order) keep the sort and grouping on ints
+        codes, self._district_ids = pd.factorize(district_id, sort=True)
+        order = np.lexsort((date, codes))  # Stable: by district, then date
+        dates = date[order]
+        # NDVI lies in [-1, 1] with 4 decimals, so float32 holds it exactly enough
+        # and halves the bytes every reduction streams; sums accumulate in float64
+        self._ndvi = ndvi[order].astype(np.float32)
+        
+        # Start of each district's run and its length
+        _, self._starts, self._counts = np.unique(codes[order], return_index=True, return_counts=True)
+        self._ends = self._starts + self._counts - 1
+        
+        # District attributes, one entry per district (from its latest observation);
+        # only these rows are gathered, the attribute columns are never reordered
+        latest = order[self._ends]
+        # object dtype so append_observations can store longer names than a '<U' input held
+        self._district_names = district_name[latest].astype(object)
+        # A handful of states repeat across districts; one interned str each
+        # (str() first: NumPy string scalars are str subclasses, which intern rejects)
+        self._states = np.array(
+            [sys.intern(str(s)) if isinstance(s, str) else s for s in state[latest].tolist()], dtype=object
+        )
+        self._lats = lat[latest]
+        self._lons = lon[latest]
+        
+        # Districts in order of first appearance in the input
+        _, first_seen = np.unique(codes, return_index=True)
+        self._input_order = codes[np.sort(first_seen)]
+        
+        # Whole days since each district's first (earliest) observation, computed
+        # once for all rows; int32 is ample for any NDVI record length
+        self._first_dates = dates[self._starts]
+        first_dates = np.repeat(self._first_dates, self._counts)
+        self._day_num = (dates - first_dates).astype('timedelta64[D]').astype(np.int32)
+        
+        if len(dates) == 0:
+            self._moments = np.empty((0, 5))
+        else:
+            self._moments = self._run_moments(self._day_num, self._ndvi, self._starts, self._counts)
+        self._fit_trends()
+        self._score_districts()
+    
+    @staticmethod
+    def _run_moments(day_num, ndvi, starts, counts) -> np.ndarray:
+        """
+        Centered least-squares sums for each contiguous run of rows.
+        
+        Returns:
+            Array of shape (runs, 5): columns x_mean, y_mean, Sxx, Sxy, Syy
+        """
+        day_num = day_num.astype(np.float32)
+        
+        # Columns are stacked so each stage is a single reduceat sweep over all runs
+        x_mean, y_mean = (
+            np.add.reduceat(np.column_stack([day_num, ndvi]), starts, dtype=np.float64) / counts[:, None]
+        ).T
+        dx = day_num - np.repeat(x_mean, counts).astype(np.float32)
+        dy = ndvi - np.repeat(y_mean, counts).astype(np.float32)
+        sums = np.add.reduceat(np.column_stack([dx * dx, dx * dy, dy * dy]), starts, dtype=np.float64)
+        return np.column_stack([x_mean, y_mean, sums])
+    
+    def _fit_trends(self):
+        """Least-squares NDVI-vs-day line for every district, from its centered sums."""
+        x_mean, y_mean, sxx, sxy, syy = self._moments.T
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # slope = cov(x, y) / var(x)
+            slope = sxy / sxx
+            # R-squared for confidence; for a least-squares line 1 - SS_res / SS_tot
+            # equals Sxy^2 / (Sxx * Syy), so no residuals are materialized
+            r_squared = np.where(syy != 0, sxy * sxy / (sxx * syy), 0.0)
+        
+        self._slope = slope
+        self._intercept = y_mean - slope * x_mean
+        self._r_squared = r_squared
+    
+    def append_observations(self, ndvi_data: pd.DataFrame):
+        """
+        Add newer NDVI observations (e.g. a daily refresh) without a full refit.
+        
+        When every new row extends a known district past its latest date, the
+        new rows' centered sums are merged into that district's existing sums
+        (the pairwise update of Chan et al.), so the work is proportional to
+        the rows added rather than the whole history. Anything else - a new
+        district or a back-filled date - reloads all observations instead.
+        
+        Args:
+            ndvi_data: DataFrame in the format taken by __init__
+        """
+        district_id = ndvi_data['district_id'].to_numpy()
+        date = pd.to_datetime(ndvi_data['date']).to_numpy()
+        if len(date) == 0:
+            return
+        
+        groups = np.searchsorted(self._district_ids, district_id)
+        known = groups < len(self._district_ids)
+        known[known] = self._district_ids[groups[known]] == district_id[known]
+        if not known.all():
+            self._reload_with(ndvi_data)
+            return
+        
+        day_num = (date - self._first_dates[groups]).astype('timedelta64[D]').astype(np.int32)
+        if (day_num <= self._day_num[self._ends[groups]]).any():
+            self._reload_with(ndvi_data)
+            return
+        
+        # New rows in (district, date) order, as contiguous runs per district
+        order = np.lexsort((date, groups))
+        groups, day_num = groups[order], day_num[order]
+        ndvi = ndvi_data['ndvi'].to_numpy()[order].astype(np.float32)
+        touched, run_starts, run_counts = np.unique(groups, return_index=True, return_counts=True)
+        
+        # Merge the new runs' moments into the districts' existing ones
+        new = self._run_moments(day_num, ndvi, run_starts, run_counts)
+        old = self._moments[touched]
+        n_old, n_new = self._counts[touched].astype(np.float64), run_counts.astype(np.float64)
+        n = n_old + n_new
+        dx, dy = new[:, 0] - old[:, 0], new[:, 1] - old[:, 1]
+        w = n_old * n_new / n
+        self._moments[touched] = np.column_stack([
+            old[:, 0] + dx * n_new / n,
+            old[:, 1] + dy * n_new / n,
+            old[:, 2] + new[:, 2] + dx * dx * w,
+            old[:, 3] + new[:, 3] + dx * dy * w,
+            old[:, 4] + new[:, 4] + dy * dy * w
+        ])
+        
+        # New rows go at the end of their district's run
+        self._ndvi = np.insert(self._ndvi, self._ends[groups] + 1, ndvi)
+        self._day_num = np.insert(self._day_num, self._ends[groups] + 1, day_num)
+        self._counts = self._counts + np.bincount(groups, minlength=len(self._counts))
+        self._starts = np.concatenate([[0], np.cumsum(self._counts)[:-1]])
+        self._ends = self._starts + self._counts - 1
+        
+        # District attributes come from each district's latest observation
+        latest = order[run_starts + run_counts - 1]
+        self._district_names[touched] = ndvi_data['district_name'].to_numpy()[latest]
+        self._states[touched] = ndvi_data['state'].to_numpy()[latest]
+        self._lats[touched] = ndvi_data['lat'].to_numpy()[latest]
+        self._lons[touched] = ndvi_data['lon'].to_numpy()[latest]
+        
         self.predictions = {}
+        self._predictions_cache = None
+        self._fit_trends()
+        self._score_districts()
+    
+    def _reload_with(self, ndvi_data: pd.DataFrame):
+        """Rebuild from the current observations plus `ndvi_data` (append_observations fallback)."""
+        # Current rows, with districts in their original first-seen order
+        rank = np.empty(len(self._input_order), dtype=np.int64)
+        rank[self._input_order] = np.arange(len(self._input_order))
+        codes = np.repeat(np.arange(len(self._counts)), self._counts)
+        rows = np.argsort(rank[codes], kind='stable')
+        codes = codes[rows]
+        dates = np.repeat(self._first_dates, self._counts)[rows] + self._day_num[rows].astype('timedelta64[D]')
+        
+        self._load_arrays(
+            district_id=np.concatenate([np.asarray(self._district_ids)[codes], ndvi_data['district_id'].to_numpy()]),
+            date=np.concatenate([dates, pd.to_datetime(ndvi_data['date']).to_numpy()]),
+            ndvi=np.concatenate([self._ndvi[rows], ndvi_data['ndvi'].to_numpy()]),
+            district_name=np.concatenate([self._district_names[codes], ndvi_data['district_name'].to_numpy()]),
+            state=np.concatenate([self._states[codes], ndvi_data['state'].to_numpy()]),
+            lat=np.concatenate([self._lats[codes], ndvi_data['lat'].to_numpy()]),
+            lon=np.concatenate([self._lons[codes], ndvi_data['lon'].to_numpy()])
+        )
+    
+    def _score_districts(self):
+        """
+        Harvest status, days to harvest and priority for every district.
+        
+        None of these depend on the reference date, so they are derived once,
+        straight from the fitted arrays, in the same load pass as the
+        regression; a prediction then only adds the calendar date.
+        
+        Every step is one NumPy operation over all districts at once, with no
+        per-row Python loop left for a JIT compiler to speed up.
+        """
+        # Output values are rounded here, once per array, rather than per dict
+        self._current_ndvi = np.round(self._ndvi[self._ends].astype(np.float64), 4)
+        self._decline_rate = np.round(self._slope, 6)
+        self._confidence = np.round(self._r_squared, 4)
+        
+        # Already below threshold -> harvest is imminent; not declining -> cannot predict
+        harvest_ready = self._current_ndvi <= self.HARVEST_THRESHOLD
+        self._has_date = harvest_ready | (self._decline_rate < 0)
+        self._status = self.STATUSES[np.select([harvest_ready, ~self._has_date], [1, 2], default=0)]
+        
+        # days = (threshold - current) / decline_rate
+        with np.errstate(divide='ignore', invalid='ignore'):
+            days = np.trunc((self.HARVEST_THRESHOLD - self._current_ndvi) / self._decline_rate)
+        days = np.where(harvest_ready, 0, np.maximum(days, 0))
+        self._days_to_harvest = np.where(self._has_date, days, 0).astype(np.int64)
+        
+        self._priority = self._calculate_priority_score(
+            current_ndvi=self._current_ndvi,
+            decline_rate=self._decline_rate,
+            days_to_harvest=np.where(self._has_date, self._days_to_harvest, np.nan)
+        )
+    
+    def _district_index(self, district_id: str) -> Optional[int]:
+        """
+        Position of a district in the per-district arrays, or None if unknown.
+        
+        District ids are kept sorted, so this is a binary search; the district's
+        rows are then the contiguous run self._starts[i] .. self._ends[i].
+        """
+        i = int(np.searchsorted(self._district_ids, district_id))
+        if i < len(self._district_ids) and self._district_ids[i] == district_id:
+            return i
+        return None
     
     def calculate_ndvi_decline_rate(self, district_id: str) -> Dict:
         """
@@ -72,39 +356,26 @@ class HarvestPredictor:
         Returns:
             Dict with decline_rate, r_squared, and trend analysis
         """
-        district_data = self.ndvi_data[self.ndvi_data['district_id'] == district_id].copy()
-        district_data = district_data.sort_values('date')
-        
-        if len(district_data) < self.MIN_DATA_DAYS:
-            return {"error": f"Insufficient data: need {self.MIN_DATA_DAYS} days, have {len(district_data)}"}
-        
-        # Convert dates to numeric (days since start)
-        district_data['day_num'] = (district_data['date'] - district_data['date'].min()).dt.days
-        
-        # Linear regression: NDVI = slope * day + intercept
-        x = district_data['day_num'].values
-        y = district_data['ndvi'].values
+        i = self._district_index(district_id)
+        num_days = 0 if i is None else int(self._counts[i])
         
-        # Calculate slope using numpy polyfit
-        slope, intercept = np.polyfit(x, y, 1)
+        if num_days < self.MIN_DATA_DAYS:
+            return {"error": f"Insufficient data: need {self.MIN_DATA_DAYS} days, have {num_days}"}
         
-        # Calculate R-squared for confidence
-        y_pred = slope * x + intercept
-        ss_res = np.sum((y - y_pred) ** 2)
-        ss_tot = np.sum((y - np.mean(y)) ** 2)
-        r_squared = 1 - (ss_res / ss_tot) if ss_tot != 0 else 0
+        # Linear regression NDVI = slope * day + intercept, fitted for all districts up front
+        slope = self._slope[i]
         
         return {
-            "decline_rate_per_day": round(slope, 6),  # Negative value indicates decline
-            "intercept": round(intercept, 4),
-            "r_squared": round(r_squared, 4),  # How well the linear model fits
-            "current_ndvi": round(y[-1], 4),
-            "start_ndvi": round(y[0], 4),
-            "total_days": len(x),
+            "decline_rate_per_day": self._decline_rate[i].item(),  # Negative value indicates decline
+            "intercept": round(float(self._intercept[i]), 4),
+            "r_squared": self._confidence[i].item(),  # How well the linear model fits
+            "current_ndvi": self._current_ndvi[i].item(),
+            "start_ndvi": round(float(self._ndvi[self._starts[i]]), 4),
+            "total_days": num_days,
             "trend": "declining" if slope < -0.005 else "stable" if abs(slope) < 0.005 else "increasing"
         }
     
-    def predict_harvest_date(self, district_id: str) -> Optional[Dict]:
+    def predict_harvest_date(self, district_id: str, now: Optional[datetime] = None) -> Optional[Dict]:
         """
         Predict when a district will reach harvest-ready status (NDVI < 0.4).
         
@@ -115,113 +386,108 @@ class HarvestPredictor:
         
         Args:
             district_id: The district identifier
+            now: Reference time for the predicted date (default: datetime.now());
+                pass one value when predicting many districts in a loop
             
         Returns:
             Dict with prediction details or None if prediction not possible
         """
-        analysis = self.calculate_ndvi_decline_rate(district_id)
-        
-        if "error" in analysis:
+        i = self._district_index(district_id)
+        if i is None:
             return None
         
-        district_info = self.ndvi_data[self.ndvi_data['district_id'] == district_id].iloc[-1]
-        current_ndvi = analysis["current_ndvi"]
-        decline_rate = analysis["decline_rate_per_day"]
-        
-        # If already below threshold, harvest is imminent
-        if current_ndvi <= self.HARVEST_THRESHOLD:
-            days_to_harvest = 0
-            predicted_date = datetime.now()
-            status = "HARVEST_READY"
-        elif decline_rate >= 0:
-            # NDVI not declining - cannot predict harvest
-            days_to_harvest = None
-            predicted_date = None
-            status = "NOT_DECLINING"
-        else:
-            # Calculate days until NDVI reaches threshold
-            # threshold = current + (decline_rate * days)
-            # days = (threshold - current) / decline_rate
-            days_to_harvest = int((self.HARVEST_THRESHOLD - current_ndvi) / decline_rate)
-            days_to_harvest = max(0, days_to_harvest)
-            predicted_date = datetime.now() + timedelta(days=days_to_harvest)
-            status = "PREDICTED"
-        
-        # Calculate priority score (1-10, where 10 is most urgent)
-        priority_score = self._calculate_priority_score(
-            current_ndvi=current_ndvi,
-            decline_rate=decline_rate,
-            days_to_harvest=days_to_harvest
-        )
+        # Same vectorized rules as predict_all_districts, on a one-district slice;
+        # reads the fitted arrays directly rather than a per-district analysis dict
+        predictions = self._predict_districts(np.array([i]), now or datetime.now())
+        return predictions[0] if predictions else None
+    
+    def _predict_districts(self, groups: np.ndarray, now: datetime) -> List[Dict]:
+        """
+        Vectorized harvest prediction for the districts at positions `groups`.
         
-        return {
-            "district_id": district_id,
-            "district_name": district_info["district_name"],
-            "state": district_info["state"],
-            "lat": district_info["lat"],
-            "lon": district_info["lon"],
-            "current_ndvi": current_ndvi,
-            "ndvi_decline_rate": decline_rate,
-            "predicted_harvest_date": predicted_date.strftime("%Y-%m-%d") if predicted_date else None,
-            "days_until_harvest": days_to_harvest,
-            "priority_score": priority_score,
-            "status": status,
-            "confidence": analysis["r_squared"]
-        }
+        Gathers the per-district results scored at load time and adds the
+        calendar dates; Python objects are only built for the final dicts.
+        Districts without enough data are skipped.
+        
+        Args:
+            groups: Positions into the per-district arrays
+            now: Reference time for predicted dates
+            
+        Returns:
+            List of prediction dictionaries in the order of `groups`
+        """
+        groups = groups[self._counts[groups] >= self.MIN_DATA_DAYS]
+        days = self._days_to_harvest[groups]
+        dates = np.datetime_as_string(np.datetime64(now.date(), 'D') + days.astype('timedelta64[D]'))
+        days_to_harvest = [d if ok else None for d, ok in zip(days.tolist(), self._has_date[groups].tolist())]
+        
+        return [
+            {
+                "district_id": self._district_ids[i],
+                "district_name": self._district_names[i],
+                "state": self._states[i],
+                "lat": self._lats[i],
+                "lon": self._lons[i],
+                "current_ndvi": ndvi,
+                "ndvi_decline_rate": rate,
+                "predicted_harvest_date": harvest_date if n_days is not None else None,
+                "days_until_harvest": n_days,
+                "priority_score": score,
+                "status": state,
+                "confidence": conf
+            }
+            for i, ndvi, rate, harvest_date, n_days, score, state, conf in zip(
+                groups.tolist(),
+                self._current_ndvi[groups].tolist(),
+                self._decline_rate[groups].tolist(),
+                dates.tolist(),
+                days_to_harvest,
+                self._priority[groups].tolist(),
+                self._status[groups].tolist(),
+                self._confidence[groups].tolist()
+            )
+        ]
     
     def _calculate_priority_score(
         self,
-        current_ndvi: float,
-        decline_rate: float,
-        days_to_harvest: Optional[int]
-    ) -> int:
+        current_ndvi,
+        decline_rate,
+        days_to_harvest
+    ):
         """
         Calculate urgency priority score (1-10) for machine allocation.
         
         Scoring factors:
-        - Lower current NDVI = higher priority (closer to harvest)
-        - Faster decline rate = higher priority (will need attention soon)
-        - Fewer days to harvest = higher priority
+        - Lower current NDVI = higher priority (closer to harvest)      (0-4 points)
+        - Faster decline rate = higher priority (will need attention soon) (0-3 points)
+        - Fewer days to harvest = higher priority                       (0-3 points)
+        
+        Each factor is a table lookup on its bin (np.digitize), so the same
+        code scores one district or a whole array of districts. It runs once
+        per load over every district (see _score_districts), which keeps it
+        off the request path without needing a compiled extension.
         
         Args:
-            current_ndvi: Current NDVI value
-            decline_rate: Daily NDVI decline rate (negative value)
-            days_to_harvest: Predicted days until harvest-ready
+            current_ndvi: Current NDVI value(s)
+            decline_rate: Daily NDVI decline rate(s) (negative value)
+            days_to_harvest: Predicted days until harvest-ready (None / NaN if unknown)
             
         Returns:
-            Priority score from 1 (low) to 10 (urgent)
+            Priority score from 1 (low) to 10 (urgent); an int for scalar
+            inputs, an int array for array inputs
         """
-        score = 0
-        
-        # Factor 1: Current NDVI level (0-4 points)
-        if current_ndvi <= 0.35:
-            score += 4  # Very close to harvest
-        elif current_ndvi <= 0.45:
-            score += 3  # Near harvest
-        elif current_ndvi <= 0.55:
-            score += 2  # Approaching harvest
-        elif current_ndvi <= 0.65:
-            score += 1  # Still growing
-        
-        # Factor 2: Decline rate (0-3 points)
-        if decline_rate <= -0.02:
-            score += 3  # Rapid decline
-        elif decline_rate <= -0.015:
-            score += 2  # Moderate decline
-        elif decline_rate <= -0.01:
-            score += 1  # Slow decline
-        
-        # Factor 3: Days to harvest (0-3 points)
-        if days_to_harvest is not None:
-            if days_to_harvest <= 3:
-                score += 3  # Imminent
-            elif days_to_harvest <= 7:
-                score += 2  # Soon
-            elif days_to_harvest <= 14:
-                score += 1  # Upcoming
+        days = np.asarray(np.nan if days_to_harvest is None else days_to_harvest, dtype=np.float64)
+        
+        # NaN days (no prediction) fall past the last bin and score 0
+        score = (
+            self.NDVI_POINTS[np.digitize(current_ndvi, self.NDVI_BINS, right=True)]
+            + self.RATE_POINTS[np.digitize(decline_rate, self.RATE_BINS, right=True)]
+            + self.DAYS_POINTS[np.digitize(days, self.DAYS_BINS, right=True)]
+        )
         
         # Ensure score is within 1-10 range
-        return max(1, min(10, score))
+        score = np.clip(score, 1, 10)
+        return int(score) if score.ndim == 0 else score
     
     def predict_all_districts(self) -> List[Dict]:
         """
@@ -230,19 +496,48 @@ class HarvestPredictor:
         Returns:
             List of prediction dictionaries, sorted by priority score (descending)
         """
-        district_ids = self.ndvi_data['district_id'].unique()
-        predictions = []
+        now = datetime.now()
+        
+        # The NDVI arrays are fixed at construction, so results only change
+        # with the reference date - reuse them for repeat calls on the same day
+        if self._predictions_cache is not None and self._predictions_cache[0] == now.date():
+            return list(self._predictions_cache[1])
         
-        for district_id in district_ids:
-            prediction = self.predict_harvest_date(district_id)
-            if prediction:
-                predictions.append(prediction)
+        predictions = self._predict_districts(self._input_order, now)
         
         # Sort by priority score (highest first)
         predictions.sort(key=lambda x: x['priority_score'], reverse=True)
         
         self.predictions = {p['district_id']: p for p in predictions}
-        return predictions
+        self._predictions_cache = (now.date(), predictions)
+        return list(predictions)
+    
+    @classmethod
+    def predict_many(cls, datasets: List[pd.DataFrame], n_jobs: int = -1) -> List[List[Dict]]:
+        """
+        Predict several independent NDVI datasets (e.g. daily refreshes or
+        separate regions) in parallel worker processes.
+        
+        Each worker takes a contiguous chunk of datasets rather than one
+        dataset per dispatch; within a dataset all districts are already
+        vectorized, so datasets are the unit of parallelism.
+        
+        Args:
+            datasets: NDVI DataFrames, each in the format taken by __init__
+            n_jobs: Worker processes to use (-1 = one per CPU core)
+            
+        Returns:
+            predict_all_districts() output for each dataset, in input order
+        """
+        workers = (os.cpu_count() or 1) if n_jobs == -1 else max(1, n_jobs)
+        workers = min(workers, len(datasets))
+        
+        if workers <= 1:
+            return [cls(ndvi_data).predict_all_districts() for ndvi_data in datasets]
+        
+        chunk_size = -(-len(datasets) // workers)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(_predict_dataset, repeat(cls), datasets, chunksize=chunk_size))
     
     def get_urgent_districts(self, min_priority: int = 7) -> List[Dict]:
         """
@@ -260,10 +555,18 @@ class HarvestPredictor:
         return [p for p in self.predictions.values() if p['priority_score'] >= min_priority]
     
     def to_json(self) -> str:
-        """Export all predictions as JSON string."""
+        """Export all predictions as JSON string (orjson; NumPy scalars serialize natively)."""
         if not self.predictions:
             self.predict_all_districts()
-        return json.dumps(list(self.predictions.values()), indent=2)
+        return orjson.dumps(
+            list(self.predictions.values()),
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+        ).decode()
+
+
+def _predict_dataset(predictor_cls: type, ndvi_data: pd.DataFrame) -> List[Dict]:
+    """Worker entry point for HarvestPredictor.predict_many (must be importable at module level)."""
+    return predictor_cls(ndvi_data).predict_all_districts()
 
 
 if __name__ == "__main__":
@@ -19,17 +19,77 @@ Author: AgriTrack Team
 Version: 1.0.0
 """
 
-import math
+from collections import Counter
+from itertools import islice
+import numpy as np
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass, asdict, field
-import json
+from typing import List, Dict, Iterator, Optional, Tuple
+from dataclasses import dataclass, field, fields
+import orjson
 
 from harvest_predictor import HarvestPredictor
-from mock_data import generate_district_ndvi_data, get_machines_data, DISTRICTS
+from mock_data import generate_district_ndvi_arrays, get_machines_data, DISTRICTS
 
 
-@dataclass
+# SMS templates by (message_type, language). Fields: name, start_ddmm / end_ddmm
+# ('%d/%m'), start_dbm / end_dbm ('%d %b') and priority (upper-cased level).
+# Messages stay str: they leave this service inside JSON responses, which are
+# encoded once per response, so pre-encoding the Devanagari text would not save work
+SMS_TEMPLATES: Dict[Tuple[str, str], str] = {
+    ('schedule_assigned', 'hindi'): (
+        "प्रिय {name}, "
+        "आपकी फसल कटाई की तारीख "
+        "{start_ddmm} से "
+        "{end_ddmm} के बीच है। "
+        "मशीन बुक करने के लिए AgriTrack ऐप पर जाएं। "
+        "समय पर बुकिंग पर Green Credits मिलेंगे! "
+        "- AgriTrack"
+    ),
+    ('schedule_assigned', 'english'): (
+        "Dear {name}, "
+        "your optimal harvest window is "
+        "{start_dbm} to "
+        "{end_dbm}. "
+        "Book now on AgriTrack app for priority access. "
+        "Earn Green Credits for on-time booking! "
+        "- AgriTrack"
+    ),
+    ('reminder_3day', 'hindi'): (
+        "रिमाइंडर: {name}, "
+        "आपकी हार्वेस्ट विंडो 3 दिन में शुरू होगी "
+        "({start_ddmm})। "
+        "अभी मशीन बुक करें! - AgriTrack"
+    ),
+    ('reminder_3day', 'english'): (
+        "Reminder: {name}, "
+        "your harvest window starts in 3 days "
+        "({start_dbm}). "
+        "Book your machine now! - AgriTrack"
+    ),
+    ('booking_open', 'hindi'): (
+        "{name}, आपकी बुकिंग विंडो अब खुली है! "
+        "AgriTrack ऐप पर जाएं और मशीन बुक करें। "
+        "Priority: {priority} - AgriTrack"
+    ),
+    ('booking_open', 'english'): (
+        "{name}, your booking window is now OPEN! "
+        "Visit AgriTrack app to book your machine. "
+        "Priority: {priority} - AgriTrack"
+    ),
+    ('incentive_earned', 'hindi'): (
+        "बधाई हो {name}! "
+        "आपने समय पर बुकिंग के लिए Green Credits कमाए। "
+        "अपना बैलेंस देखने के लिए AgriTrack ऐप खोलें। - AgriTrack"
+    ),
+    ('incentive_earned', 'english'): (
+        "Congratulations {name}! "
+        "You earned Green Credits for on-time booking. "
+        "Open AgriTrack app to view your balance. - AgriTrack"
+    ),
+}
+
+
+@dataclass(slots=True)
 class HarvestCluster:
     """Represents a group of farmers/districts with similar harvest timing."""
     id: str
@@ -44,13 +104,13 @@ class HarvestCluster:
     machines_required: int
     machines_allocated: int
     total_acres: float = 0.0
-    farmers: List[Dict] = field(default_factory=list)
+    farmers: List[Dict] = field(default_factory=list)  # Always a list; callers len() / iterate it directly
     status: str = 'pending'
     season: str = 'Kharif 2025'
     crop_type: str = 'rice'
 
 
-@dataclass
+@dataclass(slots=True)
 class FarmerSchedule:
     """Individual farmer's assigned harvest schedule."""
     farmer_id: str
@@ -73,7 +133,7 @@ class FarmerSchedule:
     season: str = 'Kharif 2025'
 
 
-@dataclass
+@dataclass(slots=True)
 class SMSMessage:
     """Advisory SMS message to be sent to farmer."""
     farmer_id: str
@@ -85,6 +145,11 @@ class SMSMessage:
     priority: str
 
 
+def _shallow_asdict(obj) -> Dict:
+    """Field name -> value for a dataclass instance, without asdict()'s deep copy."""
+    return {f.name: getattr(obj, f.name) for f in fields(obj)}
+
+
 class HarvestScheduler:
     """
     Dynamic Harvest Scheduler that normalizes machine demand
@@ -99,12 +164,22 @@ class HarvestScheduler:
     MIN_MACHINES_PER_CLUSTER = 3     # Minimum machines needed per cluster
     MAX_OVERLAP_PERCENTAGE = 0.3     # Max 30% overlap between clusters
     ACRES_PER_MACHINE_PER_DAY = 10   # Average machine capacity (acres/day)
+    # Integer heatmap cell fields, in get_machine_availability_grid order
+    HEATMAP_GRID_FIELDS = ('total_machines', 'available', 'booked', 'capacity_acres', 'demand_percentage')
     SEASON = 'Kharif 2025'
     
     # Priority thresholds
     PRIORITY_ACRES_THRESHOLD = 15    # Farmers with >15 acres get priority
     PREMIUM_ACRES_THRESHOLD = 25     # Farmers with >25 acres get premium
     
+    # Gantt colour by cluster priority score (index 0-10)
+    PRIORITY_COLORS = (
+        ['#22c55e'] * 4 +    # 0-3: green - low
+        ['#eab308'] * 2 +    # 4-5: yellow - medium
+        ['#f97316'] * 2 +    # 6-7: orange - high
+        ['#ef4444'] * 3      # 8-10: red - urgent
+    )
+    
     def __init__(
         self,
         predictions: List[Dict],
@@ -127,38 +202,74 @@ class HarvestScheduler:
         self.farmers = farmers or self._generate_mock_farmers()
         self.clusters: List[HarvestCluster] = []
         self.schedules: List[FarmerSchedule] = []
+        # District id -> first cluster listing it / its farmer schedules
+        self._cluster_by_district: Dict[str, HarvestCluster] = {}
+        self._schedules_by_district: Dict[str, List[FarmerSchedule]] = {}
+        # Schedules by lowercased district name, status and priority level (for iter_schedules)
+        self._schedules_by_district_name: Dict[str, List[FarmerSchedule]] = {}
+        self._schedules_by_status: Dict[str, List[FarmerSchedule]] = {}
+        self._schedules_by_priority: Dict[str, List[FarmerSchedule]] = {}
+        # Heatmap and Gantt data, built on first request; cleared when clusters or schedules change
+        self._availability_matrix: Optional[Dict] = None
+        self._gantt_data: Optional[List[Dict]] = None
         self._district_prediction_map = {p['district_id']: p for p in predictions}
         
+        # Predicted harvest dates parsed once per district (None when not predicted)
+        self._harvest_dates: Dict[str, Optional[datetime]] = {
+            p['district_id']: (
+                datetime.strptime(p['predicted_harvest_date'], '%Y-%m-%d')
+                if p.get('predicted_harvest_date') else None
+            )
+            for p in predictions
+        }
+        
+        # Farmer lookup by id, plus farmers and their total acres grouped by
+        # district, all built in one pass
+        self._farmer_by_id: Dict[str, Dict] = {}
+        self._farmers_by_district: Dict[str, List[Dict]] = {}
+        self._acres_by_district: Dict[str, float] = {}
+        for farmer in self.farmers:
+            self._farmer_by_id.setdefault(farmer['id'], farmer)
+            district_id = farmer['district_id']
+            self._farmers_by_district.setdefault(district_id, []).append(farmer)
+            self._acres_by_district[district_id] = self._acres_by_district.get(district_id, 0) + farmer['field_acres']
+        
     def _generate_mock_farmers(self) -> List[Dict]:
         """Generate mock farmer data for simulation."""
-        farmers = []
-        farmer_id = 1
+        # 5-15 farmers per district based on district size
+        counts = np.array([5 + (hash(district['id']) % 11) for district in DISTRICTS])
         
-        for district in DISTRICTS:
-            # 5-15 farmers per district based on district size
-            num_farmers = 5 + (hash(district['id']) % 11)
-            
-            for i in range(num_farmers):
-                # Vary farm sizes realistically (2-30 acres)
-                base_acres = 5 + (farmer_id % 20)
-                
-                farmers.append({
-                    'id': f"farmer_{farmer_id:04d}",
-                    'name': f"Farmer {farmer_id}",
-                    'phone': f"+9198765{farmer_id:05d}",
-                    'district': district['name'],
-                    'district_id': district['id'],
-                    'state': district['state'],
-                    'field_id': f"field_{farmer_id:04d}",
-                    'field_acres': base_acres,
-                    'crop_type': 'rice',
-                    'lat': district['lat'] + (i * 0.01),
-                    'lon': district['lon'] + (i * 0.01),
-                    'preferred_language': 'hindi' if farmer_id % 3 != 0 else 'english'
-                })
-                farmer_id += 1
-                
-        return farmers
+        # Per-farmer columns for all districts at once: farmer ids are numbered
+        # consecutively, and each farmer's position within its district offsets
+        # its location
+        district_index = np.repeat(np.arange(len(DISTRICTS)), counts)
+        farmer_ids = np.arange(1, counts.sum() + 1)
+        positions = farmer_ids - 1 - np.repeat(np.cumsum(counts) - counts, counts)
+        
+        # Vary farm sizes realistically (2-30 acres)
+        acres = 5 + (farmer_ids % 20)
+        lats = np.array([district['lat'] for district in DISTRICTS])[district_index] + positions * 0.01
+        lons = np.array([district['lon'] for district in DISTRICTS])[district_index] + positions * 0.01
+        
+        return [
+            {
+                'id': f"farmer_{farmer_id:04d}",
+                'name': f"Farmer {farmer_id}",
+                'phone': f"+9198765{farmer_id:05d}",
+                'district': DISTRICTS[d]['name'],
+                'district_id': DISTRICTS[d]['id'],
+                'state': DISTRICTS[d]['state'],
+                'field_id': f"field_{farmer_id:04d}",
+                'field_acres': base_acres,
+                'crop_type': 'rice',
+                'lat': lat,
+                'lon': lon,
+                'preferred_language': 'hindi' if farmer_id % 3 != 0 else 'english'
+            }
+            for farmer_id, d, base_acres, lat, lon in zip(
+                farmer_ids.tolist(), district_index.tolist(), acres.tolist(), lats.tolist(), lons.tolist()
+            )
+        ]
     
     def create_clusters(self) -> List[HarvestCluster]:
         """
@@ -169,6 +280,9 @@ class HarvestScheduler:
             List of HarvestCluster objects
         """
         self.clusters = []
+        self._cluster_by_district = {}
+        self._availability_matrix = None
+        self._gantt_data = None
         
         # Filter predictions with valid harvest dates
         valid_predictions = [
@@ -179,88 +293,88 @@ class HarvestScheduler:
         if not valid_predictions:
             return self.clusters
         
-        # Sort by predicted harvest date
-        sorted_preds = sorted(
-            valid_predictions,
-            key=lambda x: x['predicted_harvest_date']
-        )
+        # Already in predicted-harvest-date order: __init__ sorts self.predictions
+        # by (date, -priority) and filtering keeps that order
+        sorted_preds = valid_predictions
+        
+        # Parse every date once and bucket it into CLUSTER_WINDOW_DAYS-wide
+        # windows counted from the first date. The dates are sorted, so each
+        # non-empty window is one contiguous slice of sorted_preds
+        dates = np.array([p['predicted_harvest_date'] for p in sorted_preds], dtype='datetime64[D]')
+        window = np.timedelta64(self.CLUSTER_WINDOW_DAYS, 'D')
+        edges = np.arange(dates[0], dates[-1] + window, window)
+        buckets = np.searchsorted(edges, dates, side='right') - 1
+        windows, slice_starts = np.unique(buckets, return_index=True)
+        slice_ends = np.append(slice_starts[1:], len(sorted_preds))
         
-        # Get date range
         first_date = datetime.strptime(sorted_preds[0]['predicted_harvest_date'], '%Y-%m-%d')
-        last_date = datetime.strptime(sorted_preds[-1]['predicted_harvest_date'], '%Y-%m-%d')
         
-        # Create time windows
-        current_date = first_date
+        # Inputs shared by every cluster, computed once rather than per window
+        available_machine_count = sum(1 for m in self.machines if m.get('status') == 'available')
+        acres_per_machine = self.ACRES_PER_MACHINE_PER_DAY * self.CLUSTER_WINDOW_DAYS
+        now = datetime.now()
+        
         cluster_num = 0
         cluster_letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
         
-        while current_date <= last_date:
+        for bucket, start, end in zip(windows.tolist(), slice_starts.tolist(), slice_ends.tolist()):
+            current_date = first_date + timedelta(days=bucket * self.CLUSTER_WINDOW_DAYS)
             window_end = current_date + timedelta(days=self.CLUSTER_WINDOW_DAYS)
+            districts_in_window = sorted_preds[start:end]
             
-            # Find districts in this window
-            districts_in_window = [
-                p for p in sorted_preds
-                if current_date <= datetime.strptime(p['predicted_harvest_date'], '%Y-%m-%d') < window_end
-            ]
+            cluster_num += 1
+            cluster_letter = cluster_letters[(cluster_num - 1) % 26]
             
-            if districts_in_window:
-                cluster_num += 1
-                cluster_letter = cluster_letters[(cluster_num - 1) % 26]
-                
-                # Calculate cluster statistics
-                avg_ndvi = sum(d['current_ndvi'] for d in districts_in_window) / len(districts_in_window)
-                avg_priority = sum(d['priority_score'] for d in districts_in_window) / len(districts_in_window)
-                
-                # Get unique regions
-                regions = list(set(d['state'] for d in districts_in_window))
-                
-                # Get district names and IDs
-                district_names = [d['district_name'] for d in districts_in_window]
-                district_ids = [d['district_id'] for d in districts_in_window]
-                
-                # Calculate total acres and machines required
-                total_acres = sum(
-                    sum(f['field_acres'] for f in self.farmers if f['district_id'] == d['district_id'])
-                    for d in districts_in_window
-                )
-                machines_required = max(
-                    self.MIN_MACHINES_PER_CLUSTER,
-                    math.ceil(total_acres / (self.ACRES_PER_MACHINE_PER_DAY * self.CLUSTER_WINDOW_DAYS))
-                )
-                
-                # Allocate available machines (greedy approach)
-                available_machines = [m for m in self.machines if m.get('status') == 'available']
-                machines_allocated = min(machines_required, len(available_machines))
-                
-                # Determine cluster status based on dates
-                now = datetime.now()
-                if window_end < now:
-                    status = 'completed'
-                elif current_date <= now < window_end:
-                    status = 'active'
-                else:
-                    status = 'pending'
-                
-                cluster = HarvestCluster(
-                    id=f"cluster_{cluster_num:02d}",
-                    name=f"Cluster {cluster_letter} - {districts_in_window[0]['district_name']}",
-                    region=', '.join(regions),
-                    districts=district_names,
-                    district_ids=district_ids,
-                    window_start=current_date,
-                    window_end=window_end - timedelta(days=1),
-                    avg_ndvi=round(avg_ndvi, 4),
-                    priority_score=round(avg_priority),
-                    machines_required=machines_required,
-                    machines_allocated=machines_allocated,
-                    total_acres=total_acres,
-                    status=status,
-                    season=self.SEASON
-                )
-                
-                self.clusters.append(cluster)
+            # Calculate cluster statistics
+            avg_ndvi = sum(d['current_ndvi'] for d in districts_in_window) / len(districts_in_window)
+            avg_priority = sum(d['priority_score'] for d in districts_in_window) / len(districts_in_window)
+            
+            # Get unique regions, in first-seen order so the output is reproducible
+            regions = list(dict.fromkeys(d['state'] for d in districts_in_window))
+            
+            # Get district names and IDs
+            district_names = [d['district_name'] for d in districts_in_window]
+            district_ids = [d['district_id'] for d in districts_in_window]
+            
+            # Calculate total acres and machines required
+            total_acres = sum(self._acres_by_district.get(d['district_id'], 0) for d in districts_in_window)
+            # Ceiling division: enough machines to cover the acres within the window
+            machines_required = max(
+                self.MIN_MACHINES_PER_CLUSTER,
+                int(-(-total_acres // acres_per_machine))
+            )
+            
+            # Allocate available machines (greedy approach)
+            machines_allocated = min(machines_required, available_machine_count)
+            
+            # Determine cluster status based on dates
+            if window_end < now:
+                status = 'completed'
+            elif current_date <= now < window_end:
+                status = 'active'
+            else:
+                status = 'pending'
+            
+            cluster = HarvestCluster(
+                id=f"cluster_{cluster_num:02d}",
+                name=f"Cluster {cluster_letter} - {districts_in_window[0]['district_name']}",
+                region=', '.join(regions),
+                districts=district_names,
+                district_ids=district_ids,
+                window_start=current_date,
+                window_end=window_end - timedelta(days=1),
+                avg_ndvi=round(avg_ndvi, 4),
+                priority_score=round(avg_priority),
+                machines_required=machines_required,
+                machines_allocated=machines_allocated,
+                total_acres=total_acres,
+                status=status,
+                season=self.SEASON
+            )
             
-            current_date = window_end
+            self.clusters.append(cluster)
+            for district_id in district_ids:
+                self._cluster_by_district.setdefault(district_id, cluster)
         
         return self.clusters
     
@@ -273,6 +387,12 @@ class HarvestScheduler:
             List of FarmerSchedule objects
         """
         self.schedules = []
+        self._schedules_by_district = {}
+        self._schedules_by_district_name = {}
+        self._schedules_by_status = {}
+        self._schedules_by_priority = {}
+        self._availability_matrix = None
+        self._gantt_data = None
         
         # Build district-to-cluster mapping
         district_cluster_map: Dict[str, HarvestCluster] = {}
@@ -293,9 +413,8 @@ class HarvestScheduler:
             
             current_ndvi = prediction['current_ndvi'] if prediction else 0.5
             optimal_date = (
-                datetime.strptime(prediction['predicted_harvest_date'], '%Y-%m-%d')
-                if prediction and prediction.get('predicted_harvest_date')
-                else cluster.window_start + timedelta(days=2)
+                self._harvest_dates.get(farmer['district_id'])
+                or cluster.window_start + timedelta(days=2)
             )
             
             # Determine priority level based on field size
@@ -332,97 +451,126 @@ class HarvestScheduler:
             )
             
             self.schedules.append(schedule)
+            self._schedules_by_district.setdefault(schedule.district_id, []).append(schedule)
+            self._schedules_by_district_name.setdefault(schedule.district.lower(), []).append(schedule)
+            self._schedules_by_status.setdefault(schedule.status, []).append(schedule)
+            self._schedules_by_priority.setdefault(schedule.priority_level, []).append(schedule)
             cluster.farmers.append(farmer)
         
         return self.schedules
     
-    def generate_sms_messages(self, message_type: str = 'schedule_assigned') -> List[SMSMessage]:
+    @property
+    def schedule_count(self) -> int:
+        """Number of farmer schedules, i.e. one SMS per schedule for each message type."""
+        return len(self.schedules)
+    
+    def iter_schedules(
+        self,
+        district: Optional[str] = None,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[FarmerSchedule]:
+        """
+        Yield farmer schedules matching every given filter, in assignment order.
+        
+        Starts from the smallest index that applies (district, status or
+        priority level) and checks the other filters only on those schedules.
+        
+        Args:
+            district: District name (case-insensitive)
+            status: Schedule status
+            priority: Priority level ('normal', 'priority', 'premium')
+            limit: Stop after this many schedules
+            
+        Returns:
+            Iterator over the matching FarmerSchedule objects
+        """
+        district = district.lower() if district else None
+        
+        candidates = self.schedules
+        for value, index in (
+            (district, self._schedules_by_district_name),
+            (status, self._schedules_by_status),
+            (priority, self._schedules_by_priority)
+        ):
+            if value:
+                matches = index.get(value, [])
+                if len(matches) < len(candidates):
+                    candidates = matches
+        
+        matching = (
+            schedule for schedule in candidates
+            if (not district or schedule.district.lower() == district)
+            and (not status or schedule.status == status)
+            and (not priority or schedule.priority_level == priority)
+        )
+        return islice(matching, limit)
+    
+    def generate_sms_messages(
+        self,
+        message_type: str = 'schedule_assigned',
+        limit: Optional[int] = None
+    ) -> List[SMSMessage]:
         """
         Generate SMS messages for farmers about their assigned schedules.
         
         Args:
             message_type: Type of message to generate
+            limit: Stop after this many messages; the rest are never formatted
             
         Returns:
             List of SMSMessage objects ready to be sent via Twilio
         """
-        messages = []
+        return list(islice(self.iter_sms_messages(message_type), limit))
+    
+    def iter_sms_messages(self, message_type: str = 'schedule_assigned') -> Iterator[SMSMessage]:
+        """
+        Yield SMS messages one schedule at a time (see generate_sms_messages).
+        
+        Lets a sender dispatch messages as they are built instead of holding
+        the whole batch in memory. The templates for message_type are looked
+        up once, before the loop; an unknown type yields nothing.
+        
+        Args:
+            message_type: Type of message to generate
+            
+        Yields:
+            SMSMessage objects ready to be sent via Twilio
+        """
+        # Templates for this message type; languages without their own fall back to English
+        hindi_template = SMS_TEMPLATES.get((message_type, 'hindi'))
+        english_template = SMS_TEMPLATES.get((message_type, 'english'))
+        if hindi_template is None:
+            return
+        
+        # Schedules in a cluster share its window, so dates are formatted once per window
+        window_dates: Dict[Tuple[datetime, datetime], Dict[str, str]] = {}
         
         for schedule in self.schedules:
             # Find farmer's preferred language
-            farmer = next((f for f in self.farmers if f['id'] == schedule.farmer_id), None)
+            farmer = self._farmer_by_id.get(schedule.farmer_id)
             language = farmer.get('preferred_language', 'hindi') if farmer else 'hindi'
             
-            if message_type == 'schedule_assigned':
-                if language == 'hindi':
-                    content = (
-                        f"प्रिय {schedule.farmer_name}, "
-                        f"आपकी फसल कटाई की तारीख "
-                        f"{schedule.assigned_window_start.strftime('%d/%m')} से "
-                        f"{schedule.assigned_window_end.strftime('%d/%m')} के बीच है। "
-                        f"मशीन बुक करने के लिए AgriTrack ऐप पर जाएं। "
-                        f"समय पर बुकिंग पर Green Credits मिलेंगे! "
-                        f"- AgriTrack"
-                    )
-                else:
-                    content = (
-                        f"Dear {schedule.farmer_name}, "
-                        f"your optimal harvest window is "
-                        f"{schedule.assigned_window_start.strftime('%d %b')} to "
-                        f"{schedule.assigned_window_end.strftime('%d %b')}. "
-                        f"Book now on AgriTrack app for priority access. "
-                        f"Earn Green Credits for on-time booking! "
-                        f"- AgriTrack"
-                    )
-            
-            elif message_type == 'reminder_3day':
-                if language == 'hindi':
-                    content = (
-                        f"रिमाइंडर: {schedule.farmer_name}, "
-                        f"आपकी हार्वेस्ट विंडो 3 दिन में शुरू होगी "
-                        f"({schedule.assigned_window_start.strftime('%d/%m')})। "
-                        f"अभी मशीन बुक करें! - AgriTrack"
-                    )
-                else:
-                    content = (
-                        f"Reminder: {schedule.farmer_name}, "
-                        f"your harvest window starts in 3 days "
-                        f"({schedule.assigned_window_start.strftime('%d %b')}). "
-                        f"Book your machine now! - AgriTrack"
-                    )
-            
-            elif message_type == 'booking_open':
-                if language == 'hindi':
-                    content = (
-                        f"{schedule.farmer_name}, आपकी बुकिंग विंडो अब खुली है! "
-                        f"AgriTrack ऐप पर जाएं और मशीन बुक करें। "
-                        f"Priority: {schedule.priority_level.upper()} - AgriTrack"
-                    )
-                else:
-                    content = (
-                        f"{schedule.farmer_name}, your booking window is now OPEN! "
-                        f"Visit AgriTrack app to book your machine. "
-                        f"Priority: {schedule.priority_level.upper()} - AgriTrack"
-                    )
-            
-            elif message_type == 'incentive_earned':
-                if language == 'hindi':
-                    content = (
-                        f"बधाई हो {schedule.farmer_name}! "
-                        f"आपने समय पर बुकिंग के लिए Green Credits कमाए। "
-                        f"अपना बैलेंस देखने के लिए AgriTrack ऐप खोलें। - AgriTrack"
-                    )
-                else:
-                    content = (
-                        f"Congratulations {schedule.farmer_name}! "
-                        f"You earned Green Credits for on-time booking. "
-                        f"Open AgriTrack app to view your balance. - AgriTrack"
-                    )
+            window = (schedule.assigned_window_start, schedule.assigned_window_end)
+            dates = window_dates.get(window)
+            if dates is None:
+                start, end = window
+                dates = window_dates[window] = {
+                    'start_ddmm': start.strftime('%d/%m'),
+                    'end_ddmm': end.strftime('%d/%m'),
+                    'start_dbm': start.strftime('%d %b'),
+                    'end_dbm': end.strftime('%d %b')
+                }
             
-            else:
-                continue
+            template = hindi_template if language == 'hindi' else english_template
+            content = template.format(
+                name=schedule.farmer_name,
+                priority=schedule.priority_level.upper(),
+                **dates
+            )
             
-            messages.append(SMSMessage(
+            yield SMSMessage(
                 farmer_id=schedule.farmer_id,
                 schedule_id=schedule.cluster_id,
                 phone=schedule.phone,
@@ -430,67 +578,107 @@ class HarvestScheduler:
                 message_content=content,
                 language=language,
                 priority=schedule.priority_level
-            ))
-        
-        return messages
+            )
     
     def get_machine_availability_matrix(self) -> Dict:
         """
         Generate machine availability matrix for dashboard heatmap.
         Shows machines available per date per district.
         
+        Built once per set of clusters and schedules; later calls return the
+        same (read-only) dict.
+        
         Returns:
             Dict with date -> district -> availability data
         """
-        matrix = {}
+        if self._availability_matrix is not None:
+            return self._availability_matrix
+        
+        matrix: Dict[str, Dict[str, Dict]] = {}
         
         for cluster in self.clusters:
+            # Farmer acres per district name; the same for every day of the window
+            acres_by_district: Dict[str, float] = {}
+            for f in cluster.farmers:
+                district = f.get('district')
+                acres_by_district[district] = acres_by_district.get(district, 0) + f.get('field_acres', 0)
+            
+            # Daily capacity is the same for every district and day of the window
+            machines_per_day = cluster.machines_allocated // self.CLUSTER_WINDOW_DAYS
+            capacity = machines_per_day * self.ACRES_PER_MACHINE_PER_DAY
+            
             current = cluster.window_start
             while current <= cluster.window_end:
-                date_str = current.strftime('%Y-%m-%d')
-                if date_str not in matrix:
-                    matrix[date_str] = {}
+                day = matrix.setdefault(current.strftime('%Y-%m-%d'), {})
                 
                 for district in cluster.districts:
-                    farmers_in_district = [f for f in cluster.farmers if f.get('district') == district]
-                    total_acres = sum(f.get('field_acres', 0) for f in farmers_in_district)
-                    
-                    if district not in matrix[date_str]:
-                        # Calculate daily availability
-                        machines_per_day = cluster.machines_allocated // self.CLUSTER_WINDOW_DAYS
-                        capacity = machines_per_day * self.ACRES_PER_MACHINE_PER_DAY
-                        
-                        matrix[date_str][district] = {
+                    # The first cluster to reach a (date, district) cell fills it
+                    if district not in day:
+                        demand = acres_by_district.get(district, 0) / self.CLUSTER_WINDOW_DAYS
+                        day[district] = {
                             'total_machines': machines_per_day or 1,
                             'available': machines_per_day or 1,
                             'booked': 0,
                             'capacity_acres': capacity,
-                            'demand_acres': total_acres / self.CLUSTER_WINDOW_DAYS,
-                            'demand_percentage': min(100, round((total_acres / self.CLUSTER_WINDOW_DAYS) / max(capacity, 1) * 100))
+                            'demand_acres': demand,
+                            'demand_percentage': min(100, round(demand / max(capacity, 1) * 100))
                         }
                 
                 current += timedelta(days=1)
         
+        self._availability_matrix = matrix
         return matrix
     
+    def get_machine_availability_grid(self) -> Tuple[List[str], List[str], np.ndarray]:
+        """
+        Machine availability matrix as one dense array, for binary transfer.
+        
+        Holds the integer fields of get_machine_availability_matrix cells
+        (HEATMAP_GRID_FIELDS); (district, date) pairs outside every cluster
+        window are 0.
+        
+        Returns:
+            Tuple of (dates, districts, grid), grid being little-endian int16
+            of shape (len(HEATMAP_GRID_FIELDS), len(districts), len(dates))
+        """
+        matrix = self.get_machine_availability_matrix()
+        dates = sorted(matrix)
+        districts = list(dict.fromkeys(district for day in matrix.values() for district in day))
+        district_index = {district: i for i, district in enumerate(districts)}
+        
+        grid = np.zeros((len(self.HEATMAP_GRID_FIELDS), len(districts), len(dates)), dtype='<i2')
+        for t, date in enumerate(dates):
+            for district, cell in matrix[date].items():
+                grid[:, district_index[district], t] = [cell[f] for f in self.HEATMAP_GRID_FIELDS]
+        
+        return dates, districts, grid
+    
     def get_gantt_chart_data(self) -> List[Dict]:
         """
         Generate data for Gantt chart visualization on dashboard.
         
+        Built once per set of clusters and schedules; later calls return the
+        same (read-only) list.
+        
         Returns:
             List of dicts with cluster timeline data
         """
+        if self._gantt_data is not None:
+            return self._gantt_data
+        
         gantt_data = []
         
         for cluster in self.clusters:
+            start = cluster.window_start.isoformat()
+            end = cluster.window_end.isoformat()
             gantt_data.append({
                 'id': cluster.id,
                 'name': cluster.name,
                 'region': cluster.region,
-                'start': cluster.window_start.isoformat(),
-                'end': cluster.window_end.isoformat(),
-                'startDate': cluster.window_start.strftime('%Y-%m-%d'),
-                'endDate': cluster.window_end.strftime('%Y-%m-%d'),
+                'start': start,
+                'end': end,
+                'startDate': start[:10],
+                'endDate': end[:10],
                 'districts': cluster.districts,
                 'machines_allocated': cluster.machines_allocated,
                 'machines_required': cluster.machines_required,
@@ -500,35 +688,40 @@ class HarvestScheduler:
                 'avg_ndvi': cluster.avg_ndvi,
                 'priority': cluster.priority_score,
                 'status': cluster.status,
-                'color': self._get_priority_color(cluster.priority_score),
+                'color': self.PRIORITY_COLORS[min(max(cluster.priority_score, 0), 10)],
                 'season': cluster.season
             })
         
+        self._gantt_data = gantt_data
         return gantt_data
     
-    def _get_priority_color(self, priority: int) -> str:
-        """Get color based on priority score."""
-        if priority >= 8:
-            return '#ef4444'  # red - urgent
-        elif priority >= 6:
-            return '#f97316'  # orange - high
-        elif priority >= 4:
-            return '#eab308'  # yellow - medium
-        else:
-            return '#22c55e'  # green - low
-    
     def get_summary(self) -> Dict:
         """Generate scheduling summary statistics."""
         total_farmers = len(self.schedules)
         total_clusters = len(self.clusters)
-        total_machines_allocated = sum(c.machines_allocated for c in self.clusters)
-        total_machines_required = sum(c.machines_required for c in self.clusters)
-        total_acres = sum(c.total_acres for c in self.clusters)
+        
+        # Cluster totals, date range and priority bands in a single pass
+        total_machines_allocated = total_machines_required = total_acres = 0
+        window_start = window_end = None
+        priority_distribution = {'high': 0, 'medium': 0, 'low': 0}
+        for c in self.clusters:
+            total_machines_allocated += c.machines_allocated
+            total_machines_required += c.machines_required
+            total_acres += c.total_acres
+            if window_start is None or c.window_start < window_start:
+                window_start = c.window_start
+            if window_end is None or c.window_end > window_end:
+                window_end = c.window_end
+            if c.priority_score >= 8:
+                priority_distribution['high'] += 1
+            elif c.priority_score >= 5:
+                priority_distribution['medium'] += 1
+            else:
+                priority_distribution['low'] += 1
         
         # Count by priority level
         priority_counts = {'normal': 0, 'priority': 0, 'premium': 0}
-        for s in self.schedules:
-            priority_counts[s.priority_level] = priority_counts.get(s.priority_level, 0) + 1
+        priority_counts.update(Counter(s.priority_level for s in self.schedules))
         
         return {
             'total_farmers': total_farmers,
@@ -543,34 +736,24 @@ class HarvestScheduler:
             'avg_farmers_per_cluster': round(total_farmers / max(total_clusters, 1), 1),
             'avg_acres_per_farmer': round(total_acres / max(total_farmers, 1), 1),
             'date_range': {
-                'start': min(c.window_start for c in self.clusters).isoformat() if self.clusters else None,
-                'end': max(c.window_end for c in self.clusters).isoformat() if self.clusters else None
-            },
-            'priority_distribution': {
-                'high': len([c for c in self.clusters if c.priority_score >= 8]),
-                'medium': len([c for c in self.clusters if 5 <= c.priority_score < 8]),
-                'low': len([c for c in self.clusters if c.priority_score < 5])
+                'start': window_start.isoformat() if window_start else None,
+                'end': window_end.isoformat() if window_end else None
             },
+            'priority_distribution': priority_distribution,
             'farmer_priority_distribution': priority_counts,
             'season': self.SEASON
         }
     
     def get_district_schedule(self, district_id: str) -> Dict:
         """Get scheduling details for a specific district."""
-        # Find cluster containing this district
-        cluster = next(
-            (c for c in self.clusters if district_id in c.district_ids),
-            None
-        )
+        # Cluster containing this district (indexed by create_clusters)
+        cluster = self._cluster_by_district.get(district_id)
         
         if not cluster:
             return {'error': 'District not found in any cluster'}
         
-        # Get farmers in this district
-        farmers_in_district = [
-            s for s in self.schedules 
-            if s.district_id == district_id
-        ]
+        # Farmers in this district (indexed by assign_farmers_to_clusters)
+        farmers_in_district = self._schedules_by_district.get(district_id, [])
         
         return {
             'district_id': district_id,
@@ -580,7 +763,7 @@ class HarvestScheduler:
             'window_end': cluster.window_end.isoformat(),
             'farmers_count': len(farmers_in_district),
             'total_acres': sum(f.field_acres for f in farmers_in_district),
-            'farmers': [asdict(f) for f in farmers_in_district]
+            'farmers': [_shallow_asdict(f) for f in farmers_in_district]
         }
     
     def to_dict(self) -> Dict:
@@ -591,7 +774,7 @@ class HarvestScheduler:
             'summary': self.get_summary(),
             'clusters': [
                 {
-                    **asdict(c),
+                    **_shallow_asdict(c),
                     'window_start': c.window_start.isoformat(),
                     'window_end': c.window_end.isoformat(),
                     'farmers': []  # Don't include full farmer list
@@ -602,8 +785,12 @@ class HarvestScheduler:
         }
     
     def to_json(self) -> str:
-        """Export all scheduling data as JSON."""
-        return json.dumps(self.to_dict(), default=str, indent=2)
+        """Export all scheduling data as JSON (orjson; anything non-native falls back to str)."""
+        return orjson.dumps(
+            self.to_dict(),
+            default=str,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+        ).decode()
 
 
 def run_scheduler_demo():
@@ -614,8 +801,8 @@ def run_scheduler_demo():
     
     # Generate NDVI predictions
     print("\n📡 Generating NDVI data...")
-    ndvi_data = generate_district_ndvi_data(30)
-    predictor = HarvestPredictor(ndvi_data)
+    ndvi_data = generate_district_ndvi_arrays(30)
+    predictor = HarvestPredictor.from_arrays(**ndvi_data)
     predictions = predictor.predict_all_districts()
     
     # Get machines
@@ -26,6 +26,8 @@ Using Haversine formula for accurate distance between lat/lon coordinates.
 """
 
 import math
+import numpy as np
+from collections import Counter
 from typing import List, Dict, Optional, Tuple
 import json
 
@@ -39,18 +41,82 @@ class MachineAllocator:
     # Average speed for machine transport (km/h)
     TRANSPORT_SPEED_KMH = 30
     
-    def __init__(self, machines: List[Dict], predictions: List[Dict]):
+    def __init__(self, machines: List[Dict], predictions: List[Dict], precise: bool = True):
         """
         Initialize the allocator with available machines and harvest predictions.
         
         Args:
             machines: List of machine dicts with keys [id, type, lat, lon, available, capacity_acres_per_day]
             predictions: List of prediction dicts from HarvestPredictor
+            precise: Use Haversine distances (default). If False, use the cheaper
+                equirectangular approximation, which is within a fraction of a
+                percent at the few-hundred-km scale of Punjab/Haryana
         """
-        # Deep copy to avoid modifying original data
-        self.machines = [m.copy() for m in machines]
-        self.predictions = sorted(predictions, key=lambda x: x['priority_score'], reverse=True)
-        self.allocations = []
+        self.precise = precise
+        
+        # References only: machine dicts are never written (allocation state lives
+        # in self._available), and the arrays and priority order are built on
+        # first use by _ensure_prepared
+        self.machines = machines
+        self._raw_predictions = predictions
+        self._prepared = False
+        
+        self.unallocated_districts = []
+        
+        # Allocations as parallel arrays (district row, machine index, rounded
+        # distance and ETA), filled by allocate_machines; the first
+        # _num_allocated entries are valid and records are built lazily.
+        # _allocated marks that a pass has run, so accessors do not re-run it
+        self._allocated = False
+        self._num_allocated = 0
+        self._allocations = None
+        self._alloc_district = np.empty(0, dtype=np.intp)
+        self._alloc_machine = np.empty(0, dtype=np.intp)
+        self._alloc_dist = np.empty(0)
+        self._alloc_eta = np.empty(0)
+    
+    def _ensure_prepared(self):
+        """Build the priority order and the machine/district columns, once."""
+        if self._prepared:
+            return
+        
+        # Highest priority first; a stable argsort keeps input order among equal scores
+        predictions = self._raw_predictions
+        priorities = np.fromiter((p['priority_score'] for p in predictions), dtype=np.float64, count=len(predictions))
+        self._order = np.argsort(-priorities, kind='stable')
+        self._predictions = [predictions[i] for i in self._order]
+        
+        # Machine coordinates in radians (and cos of latitude), computed once so
+        # each query is one vectorized Haversine with no per-machine trig setup
+        self._m_lat_rad = np.radians(np.array([m['lat'] for m in self.machines], dtype=np.float64))
+        self._m_lon_rad = np.radians(np.array([m['lon'] for m in self.machines], dtype=np.float64))
+        self._m_cos_lat = np.cos(self._m_lat_rad)
+        
+        # Per-machine columns (same order as self.machines); availability is
+        # flipped as machines are allocated
+        self._initially_available = np.array([m.get('available', True) for m in self.machines], dtype=bool)
+        self._available = self._initially_available.copy()
+        self._m_type = np.array([m['type'] for m in self.machines], dtype=object)
+        
+        # District coordinates as columns, in self.predictions (priority) order
+        self._p_lat = np.array([p['lat'] for p in self._predictions], dtype=np.float64)
+        self._p_lon = np.array([p['lon'] for p in self._predictions], dtype=np.float64)
+        
+        self._prepared = True
+    
+    @property
+    def predictions(self) -> List[Dict]:
+        """Predictions in allocation order (highest priority first)."""
+        self._ensure_prepared()
+        return self._predictions
+    
+    def reset(self):
+        """Restore every machine's initial availability and clear allocation results."""
+        if self._prepared:
+            self._available[:] = self._initially_available
+        self._allocated = False
+        self._num_allocated = 0
+        self._allocations = None
         self.unallocated_districts = []
     
     @staticmethod
@@ -61,12 +127,15 @@ class MachineAllocator:
         The Haversine formula determines the shortest distance over the earth's
         surface, giving an "as-the-crow-flies" distance between the points.
         
+        This is the scalar form for one pair of points; the allocator itself
+        measures a district against all machines at once (see _distances_to).
+        
         Args:
             lat1, lon1: Latitude and longitude of point 1 (in degrees)
             lat2, lon2: Latitude and longitude of point 2 (in degrees)
             
         Returns:
-            Distance in kilometers
+            Distance in kilometers (unrounded; callers round for display)
         """
         # Earth's radius in kilometers
         R = 6371.0
@@ -78,12 +147,56 @@ class MachineAllocator:
         delta_lon = math.radians(lon2 - lon1)
         
         # Haversine formula
-        a = math.sin(delta_lat / 2) ** 2 + \
-            math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(delta_lon / 2) ** 2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+        sin_half_lat = math.sin(delta_lat / 2)
+        sin_half_lon = math.sin(delta_lon / 2)
+        a = sin_half_lat * sin_half_lat + \
+            math.cos(lat1_rad) * math.cos(lat2_rad) * sin_half_lon * sin_half_lon
+        # 2*asin(sqrt(a)) equals 2*atan2(sqrt(a), sqrt(1-a)) on [0, 1]; clamp round-off above 1
+        c = 2 * math.asin(math.sqrt(min(1.0, a)))
         
-        distance = R * c
-        return round(distance, 2)
+        return R * c
+    
+    def _distances_to(self, lat: float, lon: float) -> np.ndarray:
+        """
+        Haversine distance (km, unrounded) from a point to every machine.
+        
+        A brute-force pass is deliberate: it is a handful of NumPy calls over
+        the whole fleet, while a spatial index (k-d / ball tree) would have to
+        skip or rebuild around machines as the greedy pass takes them.
+        """
+        lat_rad = math.radians(lat)
+        if not self.precise:
+            return self._equirectangular_to(lat_rad, math.radians(lon))
+        
+        a = np.sin((self._m_lat_rad - lat_rad) / 2) ** 2 + \
+            math.cos(lat_rad) * self._m_cos_lat * np.sin((self._m_lon_rad - math.radians(lon)) / 2) ** 2
+        return 2 * 6371.0 * np.arcsin(np.sqrt(np.minimum(1.0, a)))
+    
+    def _distance_matrix(self) -> np.ndarray:
+        """
+        Haversine distances (km, unrounded) from every district to every machine.
+        
+        Returns:
+            Array of shape (districts, machines), rows in self.predictions order
+        """
+        p_lat_rad = np.radians(self._p_lat)[:, None]
+        p_lon_rad = np.radians(self._p_lon)[:, None]
+        if not self.precise:
+            return self._equirectangular_to(p_lat_rad, p_lon_rad)
+        
+        a = np.sin((self._m_lat_rad - p_lat_rad) / 2) ** 2 + \
+            np.cos(p_lat_rad) * self._m_cos_lat * np.sin((self._m_lon_rad - p_lon_rad) / 2) ** 2
+        return 2 * 6371.0 * np.arcsin(np.sqrt(np.minimum(1.0, a)))
+    
+    def _equirectangular_to(self, lat_rad, lon_rad) -> np.ndarray:
+        """
+        Equirectangular approximation (km) from point(s) in radians to every machine.
+        
+        Scalars give one distance per machine; (N, 1) columns broadcast to an
+        (N, machines) matrix. One cosine and a hypot per pair instead of Haversine.
+        """
+        x = (self._m_lon_rad - lon_rad) * np.cos((self._m_lat_rad + lat_rad) / 2)
+        return 6371.0 * np.hypot(x, self._m_lat_rad - lat_rad)
     
     def find_nearest_available_machine(
         self,
@@ -102,29 +215,39 @@ class MachineAllocator:
         Returns:
             Tuple of (machine_dict, distance_km) or None if no machines available
         """
-        available_machines = [m for m in self.machines if m.get('available', True)]
+        nearest = self._nearest_available(district_lat, district_lon, preferred_type)
+        if nearest is None:
+            return None
+        
+        index, distance = nearest
+        return self.machines[index], round(distance, 2)
+    
+    def _nearest_available(
+        self,
+        district_lat: float,
+        district_lon: float,
+        preferred_type: Optional[str] = None
+    ) -> Optional[Tuple[int, float]]:
+        """Like find_nearest_available_machine, but returns the machine's index and unrounded distance."""
+        self._ensure_prepared()
+        available = self._available
         
         if preferred_type:
-            # Try to find preferred type first
-            typed_machines = [m for m in available_machines if m['type'] == preferred_type]
-            if typed_machines:
-                available_machines = typed_machines
+            # Try to find preferred type first: narrow the availability mask,
+            # falling back to any available machine if none of that type is free
+            typed = available & (self._m_type == preferred_type)
+            if typed.any():
+                available = typed
         
-        if not available_machines:
+        if not available.any():
             return None
         
-        # Calculate distance to each available machine
-        machine_distances = []
-        for machine in available_machines:
-            distance = self.haversine_distance(
-                district_lat, district_lon,
-                machine['lat'], machine['lon']
-            )
-            machine_distances.append((machine, distance))
-        
-        # Sort by distance and return nearest
-        machine_distances.sort(key=lambda x: x[1])
-        return machine_distances[0]
+        distances = self._distances_to(district_lat, district_lon)
+        
+        # Nearest available machine (first one on ties, like a stable sort)
+        distances = np.where(available, distances, np.inf)
+        nearest = int(np.argmin(distances))
+        return nearest, float(distances[nearest])
     
     def allocate_machines(self) -> List[Dict]:
         """
@@ -138,66 +261,87 @@ class MachineAllocator:
         Returns:
             List of allocation dictionaries
         """
-        self.allocations = []
+        self._run_allocation()
+        return self.allocations
+    
+    def _run_allocation(self):
+        """Greedy pass that records allocations by index; dicts are built on demand."""
+        self._ensure_prepared()
+        self._allocations = None
+        self._num_allocated = 0
         self.unallocated_districts = []
         
-        for prediction in self.predictions:
-            district_id = prediction['district_id']
-            district_name = prediction['district_name']
-            district_lat = prediction['lat']
-            district_lon = prediction['lon']
-            priority = prediction['priority_score']
-            
-            # Find nearest available machine
-            result = self.find_nearest_available_machine(district_lat, district_lon)
-            
-            if result is None:
+        # All district-to-machine distances up front; the loop below only masks and picks
+        distances = self._distance_matrix()
+        
+        num_districts = len(self._predictions)
+        self._alloc_district = np.empty(num_districts, dtype=np.intp)
+        self._alloc_machine = np.empty(num_districts, dtype=np.intp)
+        self._alloc_dist = np.empty(num_districts)
+        self._alloc_eta = np.empty(num_districts)
+        
+        for i, prediction in enumerate(self._predictions):
+            if not self._available.any():
                 # No machines available
                 self.unallocated_districts.append({
-                    "district_id": district_id,
-                    "district_name": district_name,
-                    "priority_score": priority,
+                    "district_id": prediction['district_id'],
+                    "district_name": prediction['district_name'],
+                    "priority_score": prediction['priority_score'],
                     "reason": "No available machines"
                 })
                 continue
             
-            machine, distance = result
+            # Nearest available machine (first one on ties)
+            row = np.where(self._available, distances[i], np.inf)
+            index = int(np.argmin(row))
+            distance = float(row[index])
             
-            # Calculate ETA (Estimated Time of Arrival)
-            eta_hours = round(distance / self.TRANSPORT_SPEED_KMH, 1)
-            
-            # Create allocation record
-            allocation = {
-                "district_id": district_id,
-                "district_name": district_name,
-                "state": prediction['state'],
-                "priority_score": priority,
-                "machine_id": machine['id'],
-                "machine_type": machine['type'],
-                "machine_capacity_acres_per_day": machine.get('capacity_acres_per_day', 10),
-                "machine_origin": {
-                    "lat": machine['lat'],
-                    "lon": machine['lon']
-                },
-                "district_location": {
-                    "lat": district_lat,
-                    "lon": district_lon
-                },
-                "distance_km": distance,
-                "eta_hours": eta_hours,
-                "predicted_harvest_date": prediction['predicted_harvest_date'],
-                "days_until_harvest": prediction['days_until_harvest']
-            }
-            
-            self.allocations.append(allocation)
+            # Round once here; ETA (Estimated Time of Arrival) uses the unrounded distance
+            k = self._num_allocated
+            self._alloc_district[k] = i
+            self._alloc_machine[k] = index
+            self._alloc_dist[k] = round(distance, 2)
+            self._alloc_eta[k] = round(distance / self.TRANSPORT_SPEED_KMH, 1)
+            self._num_allocated += 1
             
             # Mark machine as unavailable
-            for m in self.machines:
-                if m['id'] == machine['id']:
-                    m['available'] = False
-                    break
+            self._available[index] = False
         
-        return self.allocations
+        self._allocated = True
+    
+    @property
+    def allocations(self) -> List[Dict]:
+        """Allocation records, built from the index arrays on first access."""
+        if self._allocations is None:
+            self._allocations = [self._expand_allocation(k) for k in range(self._num_allocated)]
+        return self._allocations
+    
+    def _expand_allocation(self, k: int) -> Dict:
+        """Build the public record for the k-th allocation."""
+        prediction = self._predictions[self._alloc_district[k]]
+        machine = self.machines[self._alloc_machine[k]]
+        
+        return {
+            "district_id": prediction['district_id'],
+            "district_name": prediction['district_name'],
+            "state": prediction['state'],
+            "priority_score": prediction['priority_score'],
+            "machine_id": machine['id'],
+            "machine_type": machine['type'],
+            "machine_capacity_acres_per_day": machine.get('capacity_acres_per_day', 10),
+            "machine_origin": {
+                "lat": machine['lat'],
+                "lon": machine['lon']
+            },
+            "district_location": {
+                "lat": prediction['lat'],
+                "lon": prediction['lon']
+            },
+            "distance_km": float(self._alloc_dist[k]),
+            "eta_hours": float(self._alloc_eta[k]),
+            "predicted_harvest_date": prediction['predicted_harvest_date'],
+            "days_until_harvest": prediction['days_until_harvest']
+        }
     
     def get_allocation_summary(self) -> Dict:
         """
@@ -206,24 +350,21 @@ class MachineAllocator:
         Returns:
             Dictionary with allocation statistics
         """
-        if not self.allocations and not self.unallocated_districts:
-            self.allocate_machines()
+        if not self._allocated:
+            self._run_allocation()
         
         total_districts = len(self.predictions)
-        allocated = len(self.allocations)
+        allocated = self._num_allocated
         unallocated = len(self.unallocated_districts)
         
         # Calculate statistics
-        if self.allocations:
-            avg_distance = sum(a['distance_km'] for a in self.allocations) / allocated
-            avg_eta = sum(a['eta_hours'] for a in self.allocations) / allocated
-            total_distance = sum(a['distance_km'] for a in self.allocations)
+        if allocated:
+            total_distance = float(self._alloc_dist[:allocated].sum())
+            avg_distance = total_distance / allocated
+            avg_eta = float(self._alloc_eta[:allocated].mean())
             
             # Machine type breakdown
-            machine_types = {}
-            for a in self.allocations:
-                mt = a['machine_type']
-                machine_types[mt] = machine_types.get(mt, 0) + 1
+            machine_types = dict(Counter(self._m_type[self._alloc_machine[:allocated]]))
         else:
             avg_distance = avg_eta = total_distance = 0
             machine_types = {}
@@ -237,7 +378,7 @@ class MachineAllocator:
             "average_distance_km": round(avg_distance, 2),
             "average_eta_hours": round(avg_eta, 1),
             "machines_used_by_type": machine_types,
-            "machines_remaining": len([m for m in self.machines if m.get('available', True)])
+            "machines_remaining": int(self._available.sum())
         }
     
     def get_allocations_by_priority(self, min_priority: int = 1) -> List[Dict]:
@@ -254,8 +395,8 @@ class MachineAllocator:
     
     def to_json(self) -> str:
         """Export allocation results as JSON string."""
-        if not self.allocations:
-            self.allocate_machines()
+        if not self._allocated:
+            self._run_allocation()
         
         return json.dumps({
             "allocations": self.allocations,
@@ -266,7 +407,7 @@ class MachineAllocator:
 
 if __name__ == "__main__":
     # Demo: Test the allocator with mock data
-    from mock_data import generate_district_ndvi_data, get_machines_data
+    from mock_data import generate_district_ndvi_arrays, get_machines_data
     from harvest_predictor import HarvestPredictor
     
     print("=" * 70)
@@ -274,8 +415,8 @@ if __name__ == "__main__":
     print("=" * 70)
     
     # Generate predictions
-    ndvi_df = generate_district_ndvi_data(30)
-    predictor = HarvestPredictor(ndvi_df)
+    ndvi_data = generate_district_ndvi_arrays(30)
+    predictor = HarvestPredictor.from_arrays(**ndvi_data)
     predictions = predictor.predict_all_districts()
     
     # Get available machines
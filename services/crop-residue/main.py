@@ -28,7 +28,7 @@ import sys
 import json
 from datetime import datetime
 
-from mock_data import generate_district_ndvi_data, get_machines_data, DISTRICTS
+from mock_data import generate_district_ndvi_arrays, get_machines_data, DISTRICTS
 from harvest_predictor import HarvestPredictor
 from machine_allocator import MachineAllocator
 
@@ -80,10 +80,10 @@ def run_prediction_system(output_json: bool = False, urgent_only: bool = False)
         print()
     
     # Generate mock NDVI time-series data (30 days)
-    ndvi_data = generate_district_ndvi_data(num_days=30)
+    ndvi_data = generate_district_ndvi_arrays(num_days=30)
     
     # Initialize predictor and get predictions
-    predictor = HarvestPredictor(ndvi_data)
+    predictor = HarvestPredictor.from_arrays(**ndvi_data)
     predictions = predictor.predict_all_districts()
     
     if urgent_only:
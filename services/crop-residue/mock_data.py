@@ -21,7 +21,7 @@ NDVI Value Interpretation:
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 
 # District data for Punjab, Haryana, Delhi-NCR region
@@ -55,7 +55,8 @@ def generate_ndvi_timeseries(
     num_days: int = 30,
     start_ndvi: float = None,
     decline_rate: float = None,
-    noise_factor: float = 0.02
+    noise_factor: float = 0.02,
+    rng: Optional[np.random.Generator] = None
 ) -> List[float]:
     """
     Generate realistic NDVI time-series data simulating crop maturation and harvest readiness.
@@ -70,64 +71,105 @@ def generate_ndvi_timeseries(
         start_ndvi: Initial NDVI value (default: random 0.65-0.85)
         decline_rate: Daily decline rate (default: random 0.008-0.025)
         noise_factor: Random noise amplitude
+        rng: Random generator to draw from (default: the global np.random state)
     
     Returns:
         List of NDVI values for each day
     """
+    if rng is None:
+        rng = np.random
+    
     if start_ndvi is None:
-        start_ndvi = np.random.uniform(0.65, 0.85)
+        start_ndvi = rng.uniform(0.65, 0.85)
     
     if decline_rate is None:
         # Different districts have different crop maturity rates
-        decline_rate = np.random.uniform(0.008, 0.025)
+        decline_rate = rng.uniform(0.008, 0.025)
+    
+    # NDVI naturally declines as crop matures, plus realistic noise (weather, sensor variation)
+    steps = rng.normal(0, noise_factor, size=num_days) - decline_rate
+    
+    ndvi = _clamped_ndvi_walk(np.array([start_ndvi]), steps[None, :])[0]
+    return np.round(ndvi, 4).tolist()
+
+
+def _clamped_ndvi_walk(start_ndvi: np.ndarray, steps: np.ndarray) -> np.ndarray:
+    """
+    Walk each row from its start value by its daily steps, clamped to [0.1, 1.0] each day.
+    
+    Holding the walk at the floor is the same as lifting it by its deepest dip
+    below the floor so far, so every row is one cumsum; the ceiling is rarely
+    reached and only those rows fall back to the day-by-day walk.
+    
+    Args:
+        start_ndvi: Initial NDVI per row, shape (rows,)
+        steps: Daily NDVI change per row, shape (rows, days)
+    
+    Returns:
+        Unrounded NDVI values, shape (rows, days)
+    """
+    ndvi = start_ndvi[:, None] + np.cumsum(steps, axis=1)
+    ndvi += np.maximum(np.maximum.accumulate(0.1 - ndvi, axis=1), 0.0)
+    
+    for row in np.flatnonzero((ndvi > 1.0).any(axis=1)):
+        current_ndvi = start_ndvi[row]
+        for day, step in enumerate(steps[row]):
+            current_ndvi = max(0.1, min(1.0, current_ndvi + step))
+            ndvi[row, day] = current_ndvi
     
-    ndvi_values = []
-    current_ndvi = start_ndvi
+    return ndvi
+
+
+def generate_district_ndvi_arrays(num_days: int = 30) -> Dict[str, np.ndarray]:
+    """
+    Generate NDVI time-series data for all districts as one array per column.
     
-    for day in range(num_days):
-        # Add realistic noise (weather, sensor variation)
-        noise = np.random.normal(0, noise_factor)
-        
-        # NDVI naturally declines as crop matures
-        current_ndvi = current_ndvi - decline_rate + noise
-        
-        # Clamp to valid NDVI range [0, 1]
-        current_ndvi = max(0.1, min(1.0, current_ndvi))
-        
-        ndvi_values.append(round(current_ndvi, 4))
+    Rows are district-major (every day of the first district, then the next),
+    and the keys match HarvestPredictor.from_arrays, so the result can be
+    passed straight through with ``HarvestPredictor.from_arrays(**arrays)``.
     
-    return ndvi_values
+    Returns:
+        Dict of equal-length arrays: date, district_id, district_name, state, lat, lon, ndvi
+    """
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=num_days - 1)
+    dates = [(start_date + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(num_days)]
+    
+    # Generate unique NDVI pattern for each district, all districts in one pass
+    # (same start and decline ranges as generate_ndvi_timeseries)
+    num_districts = len(DISTRICTS)
+    start_ndvi = np.random.uniform(0.65, 0.85, num_districts)
+    decline_rate = np.random.uniform(0.008, 0.025, num_districts)
+    steps = np.random.normal(0, 0.02, (num_districts, num_days)) - decline_rate[:, None]
+    ndvi = np.round(_clamped_ndvi_walk(start_ndvi, steps), 4)
+    
+    def per_district(key, dtype=object):
+        return np.repeat(np.array([d[key] for d in DISTRICTS], dtype=dtype), num_days)
+    
+    return {
+        "date": np.tile(np.array(dates, dtype=object), len(DISTRICTS)),
+        "district_id": per_district("id"),
+        "district_name": per_district("name"),
+        "state": per_district("state"),
+        "lat": per_district("lat", np.float64),
+        "lon": per_district("lon", np.float64),
+        "ndvi": ndvi.reshape(-1)
+    }
 
 
 def generate_district_ndvi_data(num_days: int = 30) -> pd.DataFrame:
     """
     Generate NDVI time-series data for all districts.
     
+    DataFrame wrapper around generate_district_ndvi_arrays, for callers that
+    filter or print with pandas.
+    
     Returns:
         DataFrame with columns: date, district_id, district_name, state, lat, lon, ndvi
     """
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=num_days - 1)
-    dates = [start_date + timedelta(days=i) for i in range(num_days)]
-    
-    records = []
-    
-    for district in DISTRICTS:
-        # Generate unique NDVI pattern for each district
-        ndvi_series = generate_ndvi_timeseries(num_days)
-        
-        for i, date in enumerate(dates):
-            records.append({
-                "date": date.strftime("%Y-%m-%d"),
-                "district_id": district["id"],
-                "district_name": district["name"],
-                "state": district["state"],
-                "lat": district["lat"],
-                "lon": district["lon"],
-                "ndvi": ndvi_series[i]
-            })
-    
-    return pd.DataFrame(records)
+    arrays = generate_district_ndvi_arrays(num_days)
+    columns = ["date", "district_id", "district_name", "state", "lat", "lon", "ndvi"]
+    return pd.DataFrame({column: arrays[column] for column in columns})
 
 
 def get_machines_data() -> List[Dict]:
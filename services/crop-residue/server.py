@@ -13,53 +13,104 @@ Endpoints:
     GET  /api/machines        - List all available machines
     GET  /api/urgent          - Get urgent districts only (priority >= 7)
     GET  /api/dashboard       - Complete dashboard data
+    GET  /api/dashboard/combined - Dashboard + scheduling dashboard in one response
     
     # Scheduling Endpoints (NEW)
     GET  /api/scheduling/clusters      - Get harvest clusters
     GET  /api/scheduling/schedules     - Get farmer schedules  
     GET  /api/scheduling/gantt         - Gantt chart data
     GET  /api/scheduling/heatmap       - Machine availability heatmap
+    GET  /api/scheduling/heatmap/bin   - Heatmap as a binary int16 grid
     GET  /api/scheduling/summary       - Scheduling summary
     GET  /api/scheduling/dashboard     - Complete scheduling dashboard
     GET  /api/scheduling/sms/preview   - Preview SMS messages
 """
 
-from fastapi import FastAPI, Query, HTTPException
+from fastapi import FastAPI, Query, HTTPException, Depends, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Optional, List
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import Optional, List, Dict, Iterator, Iterable, Tuple, Any
 from datetime import datetime
-from dataclasses import asdict
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+import hashlib
 import json
+import os
+import threading
+import time
+import orjson
 
 # Import our prediction modules
-from mock_data import generate_district_ndvi_data, get_machines_data, get_districts_data, DISTRICTS
+from mock_data import generate_district_ndvi_data, generate_district_ndvi_arrays, get_machines_data, get_districts_data, DISTRICTS
 from harvest_predictor import HarvestPredictor
 from machine_allocator import MachineAllocator
 from harvest_scheduler import HarvestScheduler
 
+# The machine and district lists are fixed for the life of the process and
+# nothing downstream mutates them, so every request shares one snapshot
+get_machines_data = lru_cache(maxsize=1)(get_machines_data)
+get_districts_data = lru_cache(maxsize=1)(get_districts_data)
+
+
+@lru_cache(maxsize=1)
+def get_machines_by_type() -> Dict[str, List[dict]]:
+    """Machines grouped by type, built once from the shared machine snapshot."""
+    by_type: Dict[str, List[dict]] = {}
+    for m in get_machines_data():
+        by_type.setdefault(m['type'], []).append(m)
+    return by_type
+
+
+@lru_cache(maxsize=1)
+def get_machines_etag() -> str:
+    """ETag of the machine snapshot; it cannot change until the process restarts."""
+    return make_etag(get_machines_data())
+
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+class OrjsonResponse(JSONResponse):
+    """JSONResponse rendered by orjson in C (NumPy values and dataclasses included)."""
+    
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Crop Residue Management API",
     description="Satellite-based harvest prediction, machine allocation, and dynamic scheduling for Punjab, Haryana, Delhi-NCR. Designed to normalize machine demand and prevent stubble burning.",
     version="2.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=OrjsonResponse
 )
 
-# Enable CORS for Next.js frontend (localhost:3000)
+# Enable CORS for the Next.js frontend and the farmer mobile app. Origins come
+# from CORS_ORIGINS (comma-separated, as for the Node API) and default to the
+# local dev servers plus the Capacitor Android WebView (https://localhost);
+# an explicit list lets the middleware answer with a fixed set lookup.
+# The API is read-only, so only GET is allowed.
+CORS_ORIGINS = os.getenv(
+    "CORS_ORIGINS",
+    "http://localhost:3000,http://127.0.0.1:3000,http://localhost:3001,"
+    "http://localhost:5173,https://localhost"
+).split(",")
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[
-        "http://localhost:3000",
-        "http://127.0.0.1:3000",
-        "http://localhost:3001",
-        "*"  # Allow all for development
-    ],
+    allow_origins=[origin.strip() for origin in CORS_ORIGINS if origin.strip()],
     allow_credentials=True,
-    allow_methods=["*"],
+    allow_methods=["GET"],
     allow_headers=["*"],
 )
 
+# Compress JSON bodies over 1 KB for clients that send Accept-Encoding: gzip
+# (browsers and Next.js fetch do); level 5 keeps most of the ratio at much less CPU than 9
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # ═══════════════════════════════════════════════════════════════════════════
 # DYNAMIC DATA GENERATION
 # ═══════════════════════════════════════════════════════════════════════════
@@ -67,33 +118,36 @@ app.add_middleware(
 def get_fresh_predictions(num_days: int = 30) -> tuple:
     """
     Generate fresh NDVI data and predictions dynamically.
-    Called on each request to ensure data is current.
+    Endpoints go through build_context, which reruns this once the cached
+    run is older than CACHE_TTL_SECONDS.
     
     Returns:
         Tuple of (predictor, predictions_list)
     """
     # Generate new NDVI time-series data
-    ndvi_data = generate_district_ndvi_data(num_days=num_days)
+    ndvi_data = generate_district_ndvi_arrays(num_days=num_days)
     
     # Create predictor and run analysis
-    predictor = HarvestPredictor(ndvi_data)
+    predictor = HarvestPredictor.from_arrays(**ndvi_data)
     predictions = predictor.predict_all_districts()
     
     return predictor, predictions
 
 
-def get_fresh_allocations(predictions: List[dict]) -> tuple:
+def get_fresh_allocations(predictions: List[dict], machines: Optional[List[dict]] = None) -> tuple:
     """
     Generate fresh machine allocations based on current predictions.
     
     Args:
         predictions: List of prediction dictionaries
+        machines: Machine list to allocate from (default: fresh get_machines_data())
         
     Returns:
         Tuple of (allocator, allocations_list, summary)
     """
     # Get fresh machine data (all available)
-    machines = get_machines_data()
+    if machines is None:
+        machines = get_machines_data()
     
     # Run allocation algorithm
     allocator = MachineAllocator(machines, predictions)
@@ -103,28 +157,216 @@ def get_fresh_allocations(predictions: List[dict]) -> tuple:
     return allocator, allocations, summary
 
 
-def get_fresh_scheduler(predictions: List[dict]) -> HarvestScheduler:
+def get_fresh_scheduler(predictions: List[dict], machines: Optional[List[dict]] = None) -> HarvestScheduler:
     """
     Generate fresh scheduler with clusters and farmer assignments.
     
     Args:
         predictions: List of prediction dictionaries
+        machines: Machine list to schedule (default: fresh get_machines_data())
         
     Returns:
         HarvestScheduler instance with clusters and schedules populated
     """
-    machines = get_machines_data()
+    if machines is None:
+        machines = get_machines_data()
     scheduler = HarvestScheduler(predictions, machines)
     scheduler.create_clusters()
     scheduler.assign_farmers_to_clusters()
     return scheduler
 
 
+# ═══════════════════════════════════════════════════════════════════════════
+# SHORT-TTL CACHE
+# ═══════════════════════════════════════════════════════════════════════════
+
+# The simulated NDVI only needs to be as fresh as the dashboard refresh, so a
+# pipeline run is reused across endpoints for this many seconds
+CACHE_TTL_SECONDS = 60
+
+# Held while computing, so concurrent misses wait for one run instead of each starting one
+_cache_lock = threading.Lock()
+
+
+@dataclass(slots=True)
+class PipelineContext:
+    """
+    Artifacts of one cached pipeline run, shared by every endpoint.
+    
+    Allocation and scheduling are filled in on first use, so endpoints that
+    only need predictions never pay for them.
+    """
+    expires_at: float
+    predictor: HarvestPredictor
+    predictions: List[dict]
+    machines: List[dict]
+    allocation: Optional[tuple] = None              # (allocator, allocations, summary)
+    scheduler: Optional[HarvestScheduler] = None
+    
+    def get_allocation(self) -> tuple:
+        """Return (allocator, allocations, summary) for this run, allocating once."""
+        with _cache_lock:
+            if self.allocation is None:
+                self.allocation = get_fresh_allocations(self.predictions, self.machines)
+            return self.allocation
+    
+    def get_scheduler(self) -> HarvestScheduler:
+        """Return the scheduler for this run, building clusters and schedules once."""
+        with _cache_lock:
+            if self.scheduler is None:
+                self.scheduler = get_fresh_scheduler(self.predictions, self.machines)
+            return self.scheduler
+
+
+# num_days -> PipelineContext
+_context_cache: Dict[int, PipelineContext] = {}
+
+
+def build_context(num_days: int = 30, refresh: bool = False) -> PipelineContext:
+    """
+    Predictions (and, lazily, allocations and schedules) reused for CACHE_TTL_SECONDS per num_days.
+    
+    Args:
+        num_days: Days of NDVI history
+        refresh: Start a new run even if the cached one has not expired
+        
+    Returns:
+        PipelineContext for the current run
+    """
+    with _cache_lock:
+        ctx = _context_cache.get(num_days)
+        if refresh or ctx is None or ctx.expires_at <= time.monotonic():
+            predictor, predictions = get_fresh_predictions(num_days)
+            ctx = PipelineContext(
+                expires_at=time.monotonic() + CACHE_TTL_SECONDS,
+                predictor=predictor,
+                predictions=predictions,
+                machines=get_machines_data()
+            )
+            _context_cache[num_days] = ctx
+        return ctx
+
+
+# num_days -> (expires_at, NDVI frame, latest NDVI by district id, its ETag)
+_ndvi_frame_cache: Dict[int, tuple] = {}
+
+
+def get_ndvi_frame(num_days: int = 30) -> tuple:
+    """
+    Simulated NDVI history for the read-only endpoints, reused for CACHE_TTL_SECONDS per num_days.
+    
+    district_id is categorical, so filtering one district compares integer
+    codes, and each district's latest NDVI is looked up once per frame rather
+    than per request. Callers must not modify the frame.
+    
+    Args:
+        num_days: Days of NDVI history
+        
+    Returns:
+        Tuple of (ndvi_frame, latest_ndvi_by_district_id, etag of the latter)
+    """
+    with _cache_lock:
+        cached = _ndvi_frame_cache.get(num_days)
+        if cached is None or cached[0] <= time.monotonic():
+            ndvi_data = generate_district_ndvi_data(num_days=num_days)
+            ndvi_data['district_id'] = ndvi_data['district_id'].astype('category')
+            # Rows are in date order within each district
+            latest_by_district = ndvi_data.groupby('district_id', observed=True, sort=False)['ndvi'].last().to_dict()
+            cached = (time.monotonic() + CACHE_TTL_SECONDS, ndvi_data, latest_by_district, make_etag(latest_by_district))
+            _ndvi_frame_cache[num_days] = cached
+        return cached[1:]
+
+
+CACHE_CONTROL_HEADER = f"public, max-age={CACHE_TTL_SECONDS}"
+
+
+def cache_control(request: Request, response: Response) -> bool:
+    """
+    Dependency that marks the response cacheable for CACHE_TTL_SECONDS.
+    
+    Returns:
+        True if the client sent Cache-Control: no-cache, i.e. wants a fresh run
+    """
+    response.headers["Cache-Control"] = CACHE_CONTROL_HEADER
+    return "no-cache" in request.headers.get("cache-control", "")
+
+
+def make_etag(payload) -> str:
+    """
+    Weak ETag for the data behind a response.
+    
+    Weak because the body also carries a generated_at timestamp, which
+    changes on every request without changing what the response describes.
+    """
+    digest = hashlib.blake2b(orjson.dumps(payload, option=ORJSON_OPTIONS), digest_size=8).hexdigest()
+    return f'W/"{digest}"'
+
+
+def check_not_modified(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Tag the response with `etag` and Cache-Control, and short-circuit repeat fetches.
+    
+    Returns:
+        A 304 Not Modified response if the client's If-None-Match already
+        holds `etag`, else None (build the full response as usual)
+    """
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL_HEADER}
+    response.headers.update(headers)
+    
+    # Weak comparison (RFC 9110): the W/ prefix is ignored on both sides
+    client_tags = {tag.strip().removeprefix("W/") for tag in request.headers.get("if-none-match", "").split(",")}
+    if "*" in client_tags or etag.removeprefix("W/") in client_tags:
+        return Response(status_code=304, headers=headers)
+    return None
+
+
+def stream_json_object(sections: Iterable[Tuple[str, Any]]) -> StreamingResponse:
+    """
+    Stream a JSON object one top-level key at a time.
+    
+    Each (key, value) pair is serialized with orjson as it is reached, so the
+    first bytes go out before later sections are built, and the payload never
+    exists as one combined dict or string. The body is the same JSON object a
+    plain dict return would produce.
+    
+    Args:
+        sections: (key, value) pairs, typically from a generator
+        
+    Returns:
+        StreamingResponse with the cacheable Cache-Control header
+    """
+    def chunks() -> Iterator[bytes]:
+        separator = b'{'
+        for key, value in sections:
+            yield separator + orjson.dumps(key) + b':' + orjson.dumps(value, option=ORJSON_OPTIONS)
+            separator = b','
+        yield b'{}' if separator == b'{' else b'}'
+    
+    return StreamingResponse(
+        chunks(),
+        media_type="application/json",
+        headers={"Cache-Control": CACHE_CONTROL_HEADER}
+    )
+
+
+@app.on_event("startup")
+async def startup():
+    """Run one small prediction so the first request does not pay warm-up costs"""
+    # The first pass through pandas/NumPy (datetime parsing, factorize,
+    # reduceat, digitize) triggers lazy imports and dispatch setup; doing it
+    # here keeps that off the first user request after a deploy
+    get_fresh_predictions(num_days=HarvestPredictor.MIN_DATA_DAYS)
+    print("🌾 Harvest predictor warmed up")
+
+
 from fastapi.responses import RedirectResponse
 
 # ═══════════════════════════════════════════════════════════════════════════
 # API ENDPOINTS
 # ═══════════════════════════════════════════════════════════════════════════
+# Handlers that run the NDVI/prediction/scheduling pipeline are plain `def`:
+# FastAPI runs those in its threadpool, so the CPU work does not block the
+# event loop. Only handlers that do no real work stay `async def`.
 
 @app.get("/", include_in_schema=False)
 async def root():
@@ -143,37 +385,46 @@ async def health_check():
 
 
 @app.get("/api/districts")
-async def get_districts():
+def get_districts(request: Request, response: Response):
     """
     Get all districts with their basic information and latest NDVI.
     Data is generated dynamically.
+    
+    Tagged with an ETag that changes with the NDVI data; a client sending it
+    back in If-None-Match gets 304 Not Modified until the data refreshes.
     """
-    # Generate fresh NDVI data
-    ndvi_data = generate_district_ndvi_data(num_days=30)
+    # Latest NDVI for each district, from the shared NDVI frame
+    _, latest_by_district, etag = get_ndvi_frame(num_days=30)
+    
+    not_modified = check_not_modified(request, response, etag)
+    if not_modified:
+        return not_modified
+    
+    # One timestamp for the whole response, not one per district
+    now = datetime.now().isoformat()
     
-    # Get latest NDVI for each district
     districts_with_ndvi = []
     for district in get_districts_data():
-        district_ndvi = ndvi_data[ndvi_data['district_id'] == district['id']]
-        latest_ndvi = district_ndvi.iloc[-1]['ndvi'] if len(district_ndvi) > 0 else None
+        latest_ndvi = latest_by_district.get(district['id'])
         
         districts_with_ndvi.append({
             **district,
             "current_ndvi": round(latest_ndvi, 4) if latest_ndvi else None,
-            "last_updated": datetime.now().isoformat()
+            "last_updated": now
         })
     
     return {
         "count": len(districts_with_ndvi),
-        "generated_at": datetime.now().isoformat(),
+        "generated_at": now,
         "districts": districts_with_ndvi
     }
 
 
 @app.get("/api/predictions")
-async def get_predictions(
+def get_predictions(
     num_days: int = Query(default=30, ge=7, le=90, description="Days of NDVI history to analyze"),
-    min_priority: Optional[int] = Query(default=None, ge=1, le=10, description="Filter by minimum priority")
+    min_priority: Optional[int] = Query(default=None, ge=1, le=10, description="Filter by minimum priority"),
+    refresh: bool = Depends(cache_control)
 ):
     """
     Get harvest predictions for all districts.
@@ -183,8 +434,8 @@ async def get_predictions(
         - num_days: Number of days of NDVI history to analyze (7-90)
         - min_priority: Filter to show only districts with this priority or higher
     """
-    # Generate fresh predictions
-    predictor, predictions = get_fresh_predictions(num_days)
+    # Predictions from the current pipeline run
+    predictions = build_context(num_days, refresh).predictions
     
     # Apply priority filter if specified
     if min_priority:
@@ -200,18 +451,16 @@ async def get_predictions(
 
 
 @app.get("/api/allocations")
-async def get_allocations(
-    num_days: int = Query(default=30, ge=7, le=90, description="Days of NDVI history")
+def get_allocations(
+    num_days: int = Query(default=30, ge=7, le=90, description="Days of NDVI history"),
+    refresh: bool = Depends(cache_control)
 ):
     """
     Get machine allocations for all districts.
     Allocations are computed dynamically using greedy algorithm.
     """
-    # Generate fresh predictions first
-    _, predictions = get_fresh_predictions(num_days)
-    
-    # Generate fresh allocations
-    allocator, allocations, summary = get_fresh_allocations(predictions)
+    # Allocations for the current pipeline run
+    allocator, allocations, summary = build_context(num_days, refresh).get_allocation()
     
     return {
         "generated_at": datetime.now().isoformat(),
@@ -223,39 +472,39 @@ async def get_allocations(
 
 
 @app.get("/api/machines")
-async def get_machines():
+async def get_machines(request: Request, response: Response):
     """
     Get all available machines with their details.
     Returns fresh machine data on each request.
+    
+    Tagged with an ETag; a client sending it back in If-None-Match gets
+    304 Not Modified.
     """
-    machines = get_machines_data()
+    not_modified = check_not_modified(request, response, get_machines_etag())
+    if not_modified:
+        return not_modified
     
-    # Group by type
-    by_type = {}
-    for m in machines:
-        mt = m['type']
-        if mt not in by_type:
-            by_type[mt] = []
-        by_type[mt].append(m)
+    machines = get_machines_data()
     
     return {
         "count": len(machines),
         "generated_at": datetime.now().isoformat(),
         "machines": machines,
-        "by_type": by_type
+        "by_type": get_machines_by_type()
     }
 
 
 @app.get("/api/urgent")
-async def get_urgent_districts(
-    threshold: int = Query(default=7, ge=1, le=10, description="Minimum priority score for urgent status")
+def get_urgent_districts(
+    threshold: int = Query(default=7, ge=1, le=10, description="Minimum priority score for urgent status"),
+    refresh: bool = Depends(cache_control)
 ):
     """
     Get only urgent districts that need immediate attention.
     Dynamically filters based on priority threshold.
     """
-    # Generate fresh predictions
-    _, predictions = get_fresh_predictions(30)
+    # Predictions from the current pipeline run
+    predictions = build_context(30, refresh).predictions
     
     # Filter urgent
     urgent = [p for p in predictions if p['priority_score'] >= threshold]
@@ -269,61 +518,75 @@ async def get_urgent_districts(
 
 
 @app.get("/api/dashboard")
-async def get_dashboard_data():
+def get_dashboard_data(refresh: bool = Depends(cache_control)):
     """
     Get all data needed for the dashboard in a single request.
     Combines predictions, allocations, and summary statistics.
     This is the main endpoint for the Next.js frontend.
     """
-    # Generate fresh predictions
-    predictor, predictions = get_fresh_predictions(30)
-    
-    # Generate fresh allocations
-    allocator, allocations, summary = get_fresh_allocations(predictions)
-    
-    # Get machines data
-    machines = get_machines_data()
+    return stream_json_object(_dashboard_sections(build_context(30, refresh)))
+
+
+def _dashboard_sections(ctx: PipelineContext) -> Iterator[Tuple[str, Any]]:
+    """Yield the /api/dashboard response from one pipeline run, one top-level key at a time."""
+    predictions = ctx.predictions
+    allocator, allocations, summary = ctx.get_allocation()
+    machines = ctx.machines
     
-    # Calculate additional statistics
-    urgent_count = len([p for p in predictions if p['priority_score'] >= 7])
-    avg_ndvi = sum(p['current_ndvi'] for p in predictions) / len(predictions) if predictions else 0
-    harvest_ready = len([p for p in predictions if p['status'] == 'HARVEST_READY'])
+    # Calculate additional statistics in one pass over the predictions
+    urgent_count = harvest_ready = 0
+    ndvi_sum = 0.0
+    for p in predictions:
+        if p['priority_score'] >= 7:
+            urgent_count += 1
+        if p['status'] == 'HARVEST_READY':
+            harvest_ready += 1
+        ndvi_sum += p['current_ndvi']
+    avg_ndvi = ndvi_sum / len(predictions) if predictions else 0
     
-    return {
-        "metadata": {
-            "generated_at": datetime.now().isoformat(),
-            "region": "Punjab, Haryana, Chandigarh, Delhi-NCR",
-            "analysis_days": 30
-        },
-        "statistics": {
-            "total_districts": len(predictions),
-            "urgent_districts": urgent_count,
-            "harvest_ready": harvest_ready,
-            "average_ndvi": round(avg_ndvi, 4),
-            "total_machines": len(machines),
-            "machines_allocated": summary['districts_allocated'],
-            "allocation_rate": summary['allocation_rate'],
-            "total_travel_km": summary['total_travel_distance_km']
-        },
-        "predictions": predictions,
-        "allocations": allocations,
-        "unallocated": allocator.unallocated_districts,
-        "machines": machines,
-        "summary": summary
+    yield "metadata", {
+        "generated_at": datetime.now().isoformat(),
+        "region": "Punjab, Haryana, Chandigarh, Delhi-NCR",
+        "analysis_days": 30
+    }
+    yield "statistics", {
+        "total_districts": len(predictions),
+        "urgent_districts": urgent_count,
+        "harvest_ready": harvest_ready,
+        "average_ndvi": round(avg_ndvi, 4),
+        "total_machines": len(machines),
+        "machines_allocated": summary['districts_allocated'],
+        "allocation_rate": summary['allocation_rate'],
+        "total_travel_km": summary['total_travel_distance_km']
     }
+    yield "predictions", predictions
+    yield "allocations", allocations
+    yield "unallocated", allocator.unallocated_districts
+    yield "machines", machines
+    yield "summary", summary
 
 
 @app.get("/api/ndvi-history/{district_id}")
-async def get_ndvi_history(
+def get_ndvi_history(
     district_id: str,
-    num_days: int = Query(default=30, ge=7, le=90)
+    num_days: int = Query(default=30, ge=7, le=90),
+    history_format: str = Query(
+        default="records",
+        alias="format",
+        description="records: history as [{date, ndvi}, ...]; columnar: dates and ndvi as parallel lists",
+        enum=["records", "columnar"]
+    )
 ):
     """
     Get NDVI time-series history for a specific district.
     Useful for displaying trend charts.
+    
+    The columnar format skips the per-day objects, so it is smaller on the
+    wire and compresses better; the default records format is what the
+    dashboard chart reads.
     """
-    # Generate NDVI data
-    ndvi_data = generate_district_ndvi_data(num_days=num_days)
+    # Shared NDVI frame (read-only)
+    ndvi_data, _, _ = get_ndvi_frame(num_days=num_days)
     
     # Filter for specific district
     district_data = ndvi_data[ndvi_data['district_id'] == district_id]
@@ -331,20 +594,26 @@ async def get_ndvi_history(
     if len(district_data) == 0:
         raise HTTPException(status_code=404, detail=f"District {district_id} not found")
     
-    # Convert to list of records
-    history = district_data[['date', 'ndvi']].to_dict(orient='records')
+    # Whole columns to Python lists, instead of a DataFrame-to-dict conversion per row
+    dates = district_data['date'].tolist()
+    ndvi = district_data['ndvi'].tolist()
     
     # Get district info
     district_info = district_data.iloc[0]
     
-    return {
+    response = {
         "district_id": district_id,
         "district_name": district_info['district_name'],
         "state": district_info['state'],
         "num_days": num_days,
-        "generated_at": datetime.now().isoformat(),
-        "history": history
+        "generated_at": datetime.now().isoformat()
     }
+    if history_format == "columnar":
+        response["dates"] = dates
+        response["ndvi"] = ndvi
+    else:
+        response["history"] = [{"date": d, "ndvi": v} for d, v in zip(dates, ndvi)]
+    return response
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -352,15 +621,14 @@ async def get_ndvi_history(
 # ═══════════════════════════════════════════════════════════════════════════
 
 @app.get("/api/scheduling/clusters", tags=["Scheduling"])
-async def get_scheduling_clusters():
+def get_scheduling_clusters(refresh: bool = Depends(cache_control)):
     """
     Get harvest clusters for the scheduling system.
     Clusters group districts with similar harvest timing to normalize machine demand.
     
     Each cluster represents a 5-day harvest window with allocated machines.
     """
-    _, predictions = get_fresh_predictions(30)
-    scheduler = get_fresh_scheduler(predictions)
+    scheduler = build_context(30, refresh).get_scheduler()
     
     clusters_data = []
     for cluster in scheduler.clusters:
@@ -370,8 +638,8 @@ async def get_scheduling_clusters():
             "region": cluster.region,
             "districts": cluster.districts,
             "district_ids": cluster.district_ids,
-            "window_start": cluster.window_start.isoformat(),
-            "window_end": cluster.window_end.isoformat(),
+            "window_start": cluster.window_start,
+            "window_end": cluster.window_end,
             "avg_ndvi": cluster.avg_ndvi,
             "priority_score": cluster.priority_score,
             "machines_required": cluster.machines_required,
@@ -391,11 +659,12 @@ async def get_scheduling_clusters():
 
 
 @app.get("/api/scheduling/schedules", tags=["Scheduling"])
-async def get_farmer_schedules(
+def get_farmer_schedules(
     district: Optional[str] = Query(default=None, description="Filter by district name"),
     status: Optional[str] = Query(default=None, description="Filter by status"),
     priority: Optional[str] = Query(default=None, description="Filter by priority level"),
-    limit: int = Query(default=100, ge=1, le=500, description="Max results")
+    limit: int = Query(default=100, ge=1, le=500, description="Max results"),
+    refresh: bool = Depends(cache_control)
 ):
     """
     Get individual farmer schedules.
@@ -406,20 +675,11 @@ async def get_farmer_schedules(
     - priority: Farmers with 15+ acres
     - premium: Farmers with 25+ acres (get first access to machines)
     """
-    _, predictions = get_fresh_predictions(30)
-    scheduler = get_fresh_scheduler(predictions)
+    scheduler = build_context(30, refresh).get_scheduler()
     
+    # Filters and limit are applied inside the scheduler, using its indexes
     schedules_data = []
-    for schedule in scheduler.schedules:
-        if district and schedule.district.lower() != district.lower():
-            continue
-        if status and schedule.status != status:
-            continue
-        if priority and schedule.priority_level != priority:
-            continue
-        if len(schedules_data) >= limit:
-            break
-            
+    for schedule in scheduler.iter_schedules(district=district, status=status, priority=priority, limit=limit):
         schedules_data.append({
             "farmer_id": schedule.farmer_id,
             "farmer_name": schedule.farmer_name,
@@ -431,9 +691,9 @@ async def get_farmer_schedules(
             "current_ndvi": schedule.current_ndvi,
             "cluster_id": schedule.cluster_id,
             "cluster_name": schedule.cluster_name,
-            "assigned_window_start": schedule.assigned_window_start.isoformat(),
-            "assigned_window_end": schedule.assigned_window_end.isoformat(),
-            "optimal_harvest_date": schedule.optimal_harvest_date.isoformat(),
+            "assigned_window_start": schedule.assigned_window_start,
+            "assigned_window_end": schedule.assigned_window_end,
+            "optimal_harvest_date": schedule.optimal_harvest_date,
             "priority_level": schedule.priority_level,
             "priority_booking_enabled": schedule.priority_booking_enabled,
             "status": schedule.status,
@@ -453,15 +713,14 @@ async def get_farmer_schedules(
 
 
 @app.get("/api/scheduling/gantt", tags=["Scheduling"])
-async def get_gantt_chart_data():
+def get_gantt_chart_data(refresh: bool = Depends(cache_control)):
     """
     Get data for Gantt chart visualization on admin dashboard.
     Shows clusters as time-based bars with machine allocation info.
     
     Used for the "Scheduling Command Center" view.
     """
-    _, predictions = get_fresh_predictions(30)
-    scheduler = get_fresh_scheduler(predictions)
+    scheduler = build_context(30, refresh).get_scheduler()
     
     return {
         "generated_at": datetime.now().isoformat(),
@@ -471,15 +730,14 @@ async def get_gantt_chart_data():
 
 
 @app.get("/api/scheduling/heatmap", tags=["Scheduling"])
-async def get_machine_heatmap():
+def get_machine_heatmap(refresh: bool = Depends(cache_control)):
     """
     Get machine availability heatmap data.
     Shows machines available per date per district.
     
     Useful for visualizing demand vs capacity across time.
     """
-    _, predictions = get_fresh_predictions(30)
-    scheduler = get_fresh_scheduler(predictions)
+    scheduler = build_context(30, refresh).get_scheduler()
     
     return {
         "generated_at": datetime.now().isoformat(),
@@ -488,14 +746,48 @@ async def get_machine_heatmap():
     }
 
 
+@app.get("/api/scheduling/heatmap/bin", tags=["Scheduling"])
+def get_machine_heatmap_binary(refresh: bool = Depends(cache_control)):
+    """
+    Machine availability heatmap as a raw int16 grid, for canvas renderers.
+    
+    Body layout (application/octet-stream):
+    - 4 bytes: little-endian length of the JSON header
+    - JSON header: shape, dtype, fields, districts, dates (space-padded to
+      an even length so the grid is 2-byte aligned)
+    - grid: C-order little-endian int16, shape [fields, districts, dates]
+    
+    A browser reads it with new Int16Array(buffer, 4 + headerLength).
+    The JSON /api/scheduling/heatmap endpoint is unchanged.
+    """
+    scheduler = build_context(30, refresh).get_scheduler()
+    dates, districts, grid = scheduler.get_machine_availability_grid()
+    
+    header = orjson.dumps({
+        "generated_at": datetime.now().isoformat(),
+        "shape": grid.shape,
+        "dtype": "int16",
+        "byte_order": "little",
+        "fields": HarvestScheduler.HEATMAP_GRID_FIELDS,
+        "districts": districts,
+        "dates": dates
+    })
+    header += b' ' * (len(header) % 2)
+    
+    return Response(
+        content=len(header).to_bytes(4, 'little') + header + grid.tobytes(order='C'),
+        media_type="application/octet-stream",
+        headers={"Cache-Control": CACHE_CONTROL_HEADER}
+    )
+
+
 @app.get("/api/scheduling/summary", tags=["Scheduling"])
-async def get_scheduling_summary():
+def get_scheduling_summary(refresh: bool = Depends(cache_control)):
     """
     Get scheduling summary with key statistics.
     Overview of the entire scheduling system's state.
     """
-    _, predictions = get_fresh_predictions(30)
-    scheduler = get_fresh_scheduler(predictions)
+    scheduler = build_context(30, refresh).get_scheduler()
     
     return {
         "generated_at": datetime.now().isoformat(),
@@ -504,54 +796,69 @@ async def get_scheduling_summary():
 
 
 @app.get("/api/scheduling/dashboard", tags=["Scheduling"])
-async def get_scheduling_dashboard():
+def get_scheduling_dashboard(refresh: bool = Depends(cache_control)):
     """
     Get complete scheduling dashboard data in a single request.
     Combines all scheduling data for the admin "Scheduling Command Center".
     
     This is the main endpoint for the scheduling dashboard UI.
     """
-    _, predictions = get_fresh_predictions(30)
-    scheduler = get_fresh_scheduler(predictions)
-    
-    return {
-        "metadata": {
-            "generated_at": datetime.now().isoformat(),
-            "region": "Punjab, Haryana, Chandigarh, Delhi-NCR",
-            "season": "Kharif 2025"
-        },
-        "summary": scheduler.get_summary(),
-        "clusters": [
-            {
-                "id": c.id,
-                "name": c.name,
-                "region": c.region,
-                "districts": c.districts,
-                "window_start": c.window_start.isoformat(),
-                "window_end": c.window_end.isoformat(),
-                "avg_ndvi": c.avg_ndvi,
-                "priority_score": c.priority_score,
-                "machines_required": c.machines_required,
-                "machines_allocated": c.machines_allocated,
-                "total_acres": c.total_acres,
-                "farmers_count": len(c.farmers),
-                "status": c.status
-            }
-            for c in scheduler.clusters
-        ],
-        "gantt_data": scheduler.get_gantt_chart_data(),
-        "heatmap_data": scheduler.get_machine_availability_matrix()
+    return stream_json_object(_scheduling_dashboard_sections(build_context(30, refresh).get_scheduler()))
+
+
+def _scheduling_dashboard_sections(scheduler: HarvestScheduler) -> Iterator[Tuple[str, Any]]:
+    """Yield the /api/scheduling/dashboard response, one top-level key at a time."""
+    yield "metadata", {
+        "generated_at": datetime.now().isoformat(),
+        "region": "Punjab, Haryana, Chandigarh, Delhi-NCR",
+        "season": "Kharif 2025"
     }
+    yield "summary", scheduler.get_summary()
+    yield "clusters", [
+        {
+            "id": c.id,
+            "name": c.name,
+            "region": c.region,
+            "districts": c.districts,
+            "window_start": c.window_start,
+            "window_end": c.window_end,
+            "avg_ndvi": c.avg_ndvi,
+            "priority_score": c.priority_score,
+            "machines_required": c.machines_required,
+            "machines_allocated": c.machines_allocated,
+            "total_acres": c.total_acres,
+            "farmers_count": len(c.farmers),
+            "status": c.status
+        }
+        for c in scheduler.clusters
+    ]
+    yield "gantt_data", scheduler.get_gantt_chart_data()
+    yield "heatmap_data", scheduler.get_machine_availability_matrix()
+
+
+@app.get("/api/dashboard/combined")
+def get_combined_dashboard(refresh: bool = Depends(cache_control)):
+    """
+    Get the main dashboard and the scheduling dashboard in one request.
+    Both sections come from the same pipeline run, so the frontend needs a
+    single round trip and the two views always agree.
+    """
+    ctx = build_context(30, refresh)
+    return stream_json_object([
+        ("dashboard", dict(_dashboard_sections(ctx))),
+        ("scheduling", dict(_scheduling_dashboard_sections(ctx.get_scheduler())))
+    ])
 
 
 @app.get("/api/scheduling/sms/preview", tags=["Scheduling", "SMS"])
-async def preview_sms_messages(
+def preview_sms_messages(
     message_type: str = Query(
         default="schedule_assigned",
         description="Type of SMS message",
         enum=["schedule_assigned", "reminder_3day", "booking_open", "incentive_earned"]
     ),
-    limit: int = Query(default=10, ge=1, le=100, description="Number of messages to preview")
+    limit: int = Query(default=10, ge=1, le=100, description="Number of messages to preview"),
+    refresh: bool = Depends(cache_control)
 ):
     """
     Preview SMS messages that would be sent to farmers.
@@ -563,9 +870,10 @@ async def preview_sms_messages(
     - booking_open: When booking window opens
     - incentive_earned: Green credits notification
     """
-    _, predictions = get_fresh_predictions(30)
-    scheduler = get_fresh_scheduler(predictions)
-    messages = scheduler.generate_sms_messages(message_type)
+    scheduler = build_context(30, refresh).get_scheduler()
+    messages = scheduler.generate_sms_messages(message_type, limit=limit)
+    # Every schedule gets one message, so the total needs no formatting
+    total_messages = scheduler.schedule_count
     
     # Convert to serializable format
     messages_data = [
@@ -580,27 +888,26 @@ async def preview_sms_messages(
             "char_count": len(m.message_content),
             "sms_segments": (len(m.message_content) // 160) + 1
         }
-        for m in messages[:limit]
+        for m in messages
     ]
     
     return {
         "generated_at": datetime.now().isoformat(),
         "message_type": message_type,
-        "total_messages": len(messages),
+        "total_messages": total_messages,
         "preview_count": len(messages_data),
-        "estimated_cost_inr": len(messages) * 0.25,  # ~₹0.25 per SMS
+        "estimated_cost_inr": total_messages * 0.25,  # ~₹0.25 per SMS
         "preview": messages_data
     }
 
 
 @app.get("/api/scheduling/district/{district_id}", tags=["Scheduling"])
-async def get_district_schedule(district_id: str):
+def get_district_schedule(district_id: str, refresh: bool = Depends(cache_control)):
     """
     Get scheduling details for a specific district.
     Shows which cluster the district belongs to and all farmers in it.
     """
-    _, predictions = get_fresh_predictions(30)
-    scheduler = get_fresh_scheduler(predictions)
+    scheduler = build_context(30, refresh).get_scheduler()
     
     result = scheduler.get_district_schedule(district_id)
     
@@ -624,4 +931,12 @@ if __name__ == "__main__":
     print("📖 API Documentation at http://localhost:8001/docs")
     print("📅 Scheduling API at http://localhost:8001/api/scheduling/dashboard")
     print()
-    uvicorn.run(app, host="0.0.0.0", port=8001, reload=True)
+    
+    if os.getenv("DEV"):
+        # Single auto-reloading process for development
+        uvicorn.run("server:app", host="0.0.0.0", port=8001, reload=True)
+    else:
+        # One worker process per core (override with WEB_CONCURRENCY); the
+        # handlers are CPU-bound, so a single process would use one core
+        workers = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+        uvicorn.run("server:app", host="0.0.0.0", port=8001, workers=workers)
@@ -4,23 +4,46 @@ Generates 50 virtual tractors with realistic sensor data
 Publishes to MQTT broker for testing the full pipeline
 """
 
-import json
 import time
-import random
-import math
 import os
-from datetime import datetime
+import socket
+import numpy as np
+import orjson
 import paho.mqtt.client as mqtt
 from dataclasses import dataclass, asdict
 from typing import List, Optional
 import threading
+from enum import IntEnum
+from itertools import cycle, repeat
 
 # Configuration
 MQTT_BROKER = os.getenv('MQTT_BROKER_HOST', 'test.mosquitto.org')  # Public test broker
 MQTT_PORT = int(os.getenv('MQTT_BROKER_PORT', 1883))
 MQTT_TOPIC = os.getenv('MQTT_TOPIC', 'agritrack/live/sensors')
+# Telemetry is resent every tick, so a lost reading is replaced moments later;
+# QoS 0 skips the PUBACK round trip (set 1 for at-least-once delivery)
+MQTT_QOS = int(os.getenv('MQTT_QOS', 0))
 NUM_MACHINES = int(os.getenv('NUM_MACHINES', 10))  # Reduced for testing
 PUBLISH_INTERVAL = float(os.getenv('PUBLISH_INTERVAL', 3.0))  # seconds
+# Publish each tick as one JSON array on MQTT_TOPIC/batch instead of one message per machine.
+# Off by default: the API subscribes to MQTT_TOPIC and expects one JSON object per message
+MQTT_BATCH = os.getenv('MQTT_BATCH', 'false').lower() == 'true'
+# 'json' (default, what the API reads) or 'binary': fixed-size BINARY_RECORD structs on MQTT_TOPIC/bin
+MQTT_PAYLOAD_FORMAT = os.getenv('MQTT_PAYLOAD_FORMAT', 'json').lower()
+# Broker connections to spread machines over (machine i publishes on connection i % MQTT_CLIENTS);
+# each has its own network thread, so large fleets aren't limited to one socket's throughput
+MQTT_CLIENTS = max(1, int(os.getenv('MQTT_CLIENTS', 1)))
+
+
+class Mode(IntEnum):
+    """Operating modes, stored per machine as int8 codes (MODE_NAMES gives the payload string)"""
+    ACTIVE = 0
+    IDLE = 1
+    OFF = 2
+    OVERHEAT = 3
+
+
+MODE_NAMES = tuple(mode.name.lower() for mode in Mode)
 
 
 @dataclass
@@ -33,16 +56,74 @@ class MachineState:
     vib_y: float
     vib_z: float
     speed: float
-    mode: str  # 'active', 'idle', 'off', 'overheat'
+    mode: Mode
     heading: float  # Direction in degrees
     fuel: float
 
 
-class VirtualMachine:
-    """Simulates a single CRM machine with realistic behavior"""
+# Packed little-endian sensor record for MQTT_PAYLOAD_FORMAT=binary (63 bytes vs ~230
+# of JSON). id is NUL-padded ASCII, mode is the Mode code, timestamp is Unix ms;
+# gps stays float64 because float32 cannot hold 6-decimal coordinates
+BINARY_RECORD = np.dtype([
+    ('id', 'S10'),
+    ('temp', '<f4'),
+    ('vib', '<f4', 3),
+    ('gps', '<f8', 2),
+    ('speed', '<f4'),
+    ('fuel_level', '<f4'),
+    ('engine_hours', '<f4'),
+    ('mode', 'u1'),
+    ('timestamp', '<u8')
+])
+
+# Columns of the per-tick uniform draws in Fleet.update. A machine is in one
+# mode per tick, so the mode updates share columns; anomalies have their own
+U_CHANGE, U_TARGET, U_MOVE, U_TURN, U_TURN_ANGLE, U_SPEED, U_TEMP, U_FUEL, U_ANOMALY, U_ANOMALY_TYPE = range(10)
+U_VIB = slice(10, 13)             # x, y, z
+U_ANOMALY_VALUES = slice(13, 16)  # overheat temp / vibration x, y, z / geofence lat, lng jump
+NUM_DRAWS = 16
+
+# Modes a machine may switch to from each mode (repeats weight the choice)
+MODE_TRANSITIONS = {
+    Mode.ACTIVE: [Mode.ACTIVE, Mode.ACTIVE, Mode.IDLE, Mode.OFF],
+    Mode.IDLE: [Mode.ACTIVE, Mode.IDLE, Mode.OFF],
+    Mode.OFF: [Mode.ACTIVE, Mode.IDLE, Mode.OFF],
+    Mode.OVERHEAT: [Mode.IDLE, Mode.OFF]
+}
+
+# Cumulative probability of switching to each mode code, one row per current mode:
+# a draw u picks the first target whose cumulative probability exceeds it
+TRANSITION_CDF = np.cumsum([
+    np.bincount(MODE_TRANSITIONS[mode], minlength=len(Mode)) / len(MODE_TRANSITIONS[mode])
+    for mode in Mode
+], axis=1)
+
+# JSON payload fields after the id, in wire order. Every value is already-encoded
+# bytes (see Fleet.get_json_payloads), so filling it in is plain byte copying
+JSON_FIELDS = (
+    b'"temp":%b,"vib_x":%b,"vib_y":%b,"vib_z":%b,"gps":[%b,%b],"speed":%b,'
+    b'"fuel_level":%b,"engine_hours":%b,"mode":"%b","timestamp":%b}'
+)
+MODE_JSON_NAMES = tuple(name.encode() for name in MODE_NAMES)
+
+# Vibration (x, y, z) range per mode code: working, engine running, powered off, erratic
+VIB_LOW = np.array([[0.02, 0.02, 0.01], [0.01, 0.01, 0.005], [0, 0, 0], [0.2, 0.15, 0.1]])
+VIB_HIGH = np.array([[0.15, 0.12, 0.08], [0.05, 0.04, 0.02], [0, 0, 0], [0.6, 0.5, 0.4]])
+
+
+class Fleet:
+    """
+    Simulates a fleet of CRM machines with realistic behavior.
+    
+    State is kept as one NumPy array per attribute (index i is machine i),
+    so every tick updates the whole fleet with a few array operations
+    instead of running Python code per machine. An update takes well under
+    a millisecond for thousands of machines; building and publishing the
+    payloads costs far more, so the update is not JIT-compiled.
+    """
     
     # Base coordinates around Punjab/Haryana (CRM hotspots)
-    BASE_LOCATIONS = [
+    BASE_LOCATIONS = np.array([
         (30.9010, 75.8573),  # Ludhiana
         (31.6340, 74.8723),  # Amritsar
         (29.9695, 76.8783),  # Karnal
@@ -51,212 +132,303 @@ class VirtualMachine:
         (30.3398, 76.3869),  # Patiala
         (29.4727, 77.7085),  # Shamli
         (30.7046, 76.7179),  # Mohali
-    ]
+    ])
     
-    def __init__(self, machine_id: str):
-        self.id = machine_id
+    def __init__(self, num_machines: int, rng: Optional[np.random.Generator] = None):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        n = num_machines
+        self.ids = [f"sim_{str(i + 1).zfill(3)}" for i in range(n)]
+        # Each machine's whole JSON payload with its id baked in: b'{"id":"sim_001","temp":%b,...}'
+        self._json_templates = [
+            b'{"id":' + orjson.dumps(machine_id).replace(b'%', b'%%') + b',' + JSON_FIELDS
+            for machine_id in self.ids
+        ]
         
         # Random starting location near base
-        base = random.choice(self.BASE_LOCATIONS)
-        self.lat = base[0] + random.uniform(-0.1, 0.1)
-        self.lng = base[1] + random.uniform(-0.1, 0.1)
-        
-        self.temp = random.uniform(35, 50)  # Normal operating temp
-        self.vib_x = 0.0
-        self.vib_y = 0.0
-        self.vib_z = 0.0
-        self.speed = 0.0
-        self.heading = random.uniform(0, 360)
-        self.fuel = random.uniform(50, 100)
+        base = self.BASE_LOCATIONS[self.rng.integers(len(self.BASE_LOCATIONS), size=n)]
+        self.lat = base[:, 0] + self.rng.uniform(-0.1, 0.1, n)
+        self.lng = base[:, 1] + self.rng.uniform(-0.1, 0.1, n)
+        
+        self.temp = self.rng.uniform(35, 50, n)  # Normal operating temp
+        self.vib = np.zeros((n, 3))              # x, y, z
+        self.speed = np.zeros(n)
+        self.heading = self.rng.uniform(0, 360, n)
+        # Direction components, recomputed only when a machine turns
+        self.heading_cos = np.cos(np.radians(self.heading))
+        self.heading_sin = np.sin(np.radians(self.heading))
+        self.fuel = self.rng.uniform(50, 100, n)
+        self.engine_hours = self.rng.uniform(100, 5000, n)
         
         # State machine
-        self.mode = random.choice(['active', 'active', 'active', 'idle', 'off'])
-        self.mode_duration = 0
-        self.anomaly_active = False
+        self.mode = self.rng.choice(np.array([Mode.ACTIVE, Mode.ACTIVE, Mode.ACTIVE, Mode.IDLE, Mode.OFF], dtype=np.int8), n)
+        self.mode_duration = np.zeros(n, dtype=np.int32)
+        self.anomaly_active = np.zeros(n, dtype=bool)
+        
+    def __len__(self) -> int:
+        return len(self.ids)
         
     def update(self):
-        """Update machine state for next tick"""
+        """Update every machine's state for the next tick"""
+        # Every random number this tick needs, drawn in one call (row i is machine i)
+        u = self.rng.random((len(self), NUM_DRAWS))
         self.mode_duration += 1
         
-        # Randomly change modes
-        if self.mode_duration > random.randint(30, 120):
-            self._change_mode()
-            self.mode_duration = 0
+        # Randomly change modes (after 30-120 ticks in the current one)
+        change = self.mode_duration > 30 + (u[:, U_CHANGE] * 91).astype(np.int32)
+        if change.any():
+            self._change_mode(np.flatnonzero(change), u)
         
         # Update based on current mode
-        if self.mode == 'active':
-            self._update_active()
-        elif self.mode == 'idle':
-            self._update_idle()
-        elif self.mode == 'off':
-            self._update_off()
-        elif self.mode == 'overheat':
-            self._update_overheat()
-            
+        self._update_active(np.flatnonzero(self.mode == Mode.ACTIVE), u)
+        self._update_idle(np.flatnonzero(self.mode == Mode.IDLE), u)
+        self._update_off(np.flatnonzero(self.mode == Mode.OFF), u)
+        self._update_overheat(np.flatnonzero(self.mode == Mode.OVERHEAT), u)
+        
+        # Vibration pattern for each machine's mode, whole fleet at once
+        self.vib = self._uniform(u[:, U_VIB], VIB_LOW[self.mode], VIB_HIGH[self.mode])
+        
+        # The hour meter runs whenever the engine does (every mode but off)
+        self.engine_hours[self.mode != Mode.OFF] += PUBLISH_INTERVAL / 3600
+        
         # Random anomaly injection (2% chance)
-        if random.random() < 0.02 and not self.anomaly_active:
-            self._inject_anomaly()
+        inject = (u[:, U_ANOMALY] < 0.02) & ~self.anomaly_active
+        if inject.any():
+            self._inject_anomaly(np.flatnonzero(inject), u)
             
-    def _change_mode(self):
-        """Transition to a new operating mode"""
-        transitions = {
-            'active': ['active', 'active', 'idle', 'off'],
-            'idle': ['active', 'idle', 'off'],
-            'off': ['active', 'idle', 'off'],
-            'overheat': ['idle', 'off']
-        }
-        self.mode = random.choice(transitions.get(self.mode, ['idle']))
-        self.anomaly_active = False
-        
-    def _update_active(self):
-        """Machine actively working in field"""
+    @staticmethod
+    def _uniform(u: np.ndarray, low, high) -> np.ndarray:
+        """Map draws in [0, 1) onto [low, high) (low/high may be per-column sequences)"""
+        low = np.asarray(low)
+        return low + u * (np.asarray(high) - low)
+        
+    def _change_mode(self, idx: np.ndarray, u: np.ndarray):
+        """Transition machines `idx` to a new operating mode"""
+        # Count the targets each draw has passed in its current mode's CDF row
+        cdf = TRANSITION_CDF[self.mode[idx]]
+        self.mode[idx] = (cdf <= u[idx, U_TARGET, None]).sum(axis=1)
+        self.mode_duration[idx] = 0
+        self.anomaly_active[idx] = False
+        
+    def _update_active(self, idx: np.ndarray, u: np.ndarray):
+        """Machines actively working in field"""
+        draws = u[idx]
+        
         # Move in current heading
-        move_distance = random.uniform(0.0001, 0.0003)
-        self.lat += move_distance * math.cos(math.radians(self.heading))
-        self.lng += move_distance * math.sin(math.radians(self.heading))
+        move_distance = self._uniform(draws[:, U_MOVE], 0.0001, 0.0003)
+        self.lat[idx] += move_distance * self.heading_cos[idx]
+        self.lng[idx] += move_distance * self.heading_sin[idx]
         
         # Occasionally change direction
-        if random.random() < 0.1:
-            self.heading = (self.heading + random.uniform(-45, 45)) % 360
-            
+        turning = idx[draws[:, U_TURN] < 0.1]
+        turn = self._uniform(u[turning, U_TURN_ANGLE], -45, 45)
+        self.heading[turning] = (self.heading[turning] + turn) % 360
+        self.heading_cos[turning] = np.cos(np.radians(self.heading[turning]))
+        self.heading_sin[turning] = np.sin(np.radians(self.heading[turning]))
+        
         # Speed 5-15 km/h
-        self.speed = random.uniform(5, 15)
+        self.speed[idx] = self._uniform(draws[:, U_SPEED], 5, 15)
         
         # Operating temperature
-        self.temp = min(85, self.temp + random.uniform(-1, 2))
-        
-        # Vibration patterns
-        self.vib_x = random.uniform(0.02, 0.15)
-        self.vib_y = random.uniform(0.02, 0.12)
-        self.vib_z = random.uniform(0.01, 0.08)
+        self.temp[idx] = np.minimum(85, self.temp[idx] + self._uniform(draws[:, U_TEMP], -1, 2))
         
         # Fuel consumption
-        self.fuel = max(0, self.fuel - random.uniform(0.01, 0.05))
-        
-    def _update_idle(self):
-        """Machine running but stationary"""
-        self.speed = 0
-        self.temp = max(40, self.temp - random.uniform(0, 1))
-        
-        # Low vibration (engine running)
-        self.vib_x = random.uniform(0.01, 0.05)
-        self.vib_y = random.uniform(0.01, 0.04)
-        self.vib_z = random.uniform(0.005, 0.02)
-        
-        self.fuel = max(0, self.fuel - random.uniform(0.005, 0.01))
-        
-    def _update_off(self):
-        """Machine powered off"""
-        self.speed = 0
-        self.temp = max(25, self.temp - random.uniform(0.5, 2))
-        self.vib_x = 0
-        self.vib_y = 0
-        self.vib_z = 0
-        
-    def _update_overheat(self):
-        """Machine overheating - critical alert"""
-        self.speed = random.uniform(0, 3)
-        self.temp = min(120, self.temp + random.uniform(1, 5))
-        
-        # Erratic vibration
-        self.vib_x = random.uniform(0.2, 0.6)
-        self.vib_y = random.uniform(0.15, 0.5)
-        self.vib_z = random.uniform(0.1, 0.4)
-        
-    def _inject_anomaly(self):
-        """Inject anomalous behavior for AI detection"""
-        anomaly_type = random.choice(['overheat', 'vibration', 'geofence'])
-        self.anomaly_active = True
-        
-        if anomaly_type == 'overheat':
-            self.mode = 'overheat'
-            self.temp = random.uniform(95, 110)
-            print(f"⚠️ Injected OVERHEAT anomaly on {self.id}")
-            
-        elif anomaly_type == 'vibration':
-            # Sudden high vibration (mechanical issue)
-            self.vib_x = random.uniform(0.4, 0.8)
-            self.vib_y = random.uniform(0.3, 0.7)
-            self.vib_z = random.uniform(0.2, 0.5)
-            print(f"⚠️ Injected VIBRATION anomaly on {self.id}")
-            
-        elif anomaly_type == 'geofence':
-            # Jump to unexpected location
-            self.lat += random.uniform(-0.5, 0.5)
-            self.lng += random.uniform(-0.5, 0.5)
-            print(f"⚠️ Injected GEOFENCE anomaly on {self.id}")
+        self.fuel[idx] = np.maximum(0, self.fuel[idx] - self._uniform(draws[:, U_FUEL], 0.01, 0.05))
+        
+    def _update_idle(self, idx: np.ndarray, u: np.ndarray):
+        """Machines running but stationary"""
+        draws = u[idx]
+        self.speed[idx] = 0
+        self.temp[idx] = np.maximum(40, self.temp[idx] - self._uniform(draws[:, U_TEMP], 0, 1))
+        self.fuel[idx] = np.maximum(0, self.fuel[idx] - self._uniform(draws[:, U_FUEL], 0.005, 0.01))
+        
+    def _update_off(self, idx: np.ndarray, u: np.ndarray):
+        """Machines powered off"""
+        self.speed[idx] = 0
+        self.temp[idx] = np.maximum(25, self.temp[idx] - self._uniform(u[idx, U_TEMP], 0.5, 2))
+        
+    def _update_overheat(self, idx: np.ndarray, u: np.ndarray):
+        """Machines overheating - critical alert"""
+        draws = u[idx]
+        self.speed[idx] = self._uniform(draws[:, U_SPEED], 0, 3)
+        self.temp[idx] = np.minimum(120, self.temp[idx] + self._uniform(draws[:, U_TEMP], 1, 5))
+        
+    def _inject_anomaly(self, idx: np.ndarray, u: np.ndarray):
+        """Inject anomalous behavior for AI detection into machines `idx`"""
+        anomaly_type = (u[idx, U_ANOMALY_TYPE] * 3).astype(np.intp)
+        self.anomaly_active[idx] = True
+        
+        # Overheat
+        overheat = idx[anomaly_type == 0]
+        self.mode[overheat] = Mode.OVERHEAT
+        self.temp[overheat] = self._uniform(u[overheat, U_ANOMALY_VALUES.start], 95, 110)
+        
+        # Sudden high vibration (mechanical issue)
+        vibration = idx[anomaly_type == 1]
+        self.vib[vibration] = self._uniform(u[vibration, U_ANOMALY_VALUES], [0.4, 0.3, 0.2], [0.8, 0.7, 0.5])
+        
+        # Jump to unexpected location
+        geofence = idx[anomaly_type == 2]
+        jump = self._uniform(u[geofence, U_ANOMALY_VALUES], -0.5, 0.5)
+        self.lat[geofence] += jump[:, 0]
+        self.lng[geofence] += jump[:, 1]
+        
+        for i, kind in zip(idx.tolist(), anomaly_type.tolist()):
+            print(f"⚠️ Injected {('OVERHEAT', 'VIBRATION', 'GEOFENCE')[kind]} anomaly on {self.ids[i]}")
             
-    def get_payload(self) -> dict:
-        """Generate MQTT payload"""
-        return {
-            "id": self.id,
-            "temp": round(self.temp, 1),
-            "vib_x": round(self.vib_x, 4),
-            "vib_y": round(self.vib_y, 4),
-            "vib_z": round(self.vib_z, 4),
-            "gps": [round(self.lat, 6), round(self.lng, 6)],
-            "speed": round(self.speed, 1),
-            "fuel_level": round(self.fuel, 1),
-            "engine_hours": round(random.uniform(100, 5000), 1),
-            "mode": self.mode,
-            "timestamp": int(datetime.now().timestamp() * 1000)
-        }
+    def get_json_payloads(self, timestamp: int) -> List[bytes]:
+        """Generate one JSON-encoded MQTT payload per machine, stamped with `timestamp` (Unix ms)"""
+        # Encode each rounded column once, then fill every machine's template
+        # with the encoded numbers - no per-machine dict or float formatting
+        vib = self.vib.T
+        return [
+            template % fields
+            for template, fields in zip(self._json_templates, zip(
+                self._json_numbers(self.temp, 1),
+                self._json_numbers(vib[0], 4),
+                self._json_numbers(vib[1], 4),
+                self._json_numbers(vib[2], 4),
+                self._json_numbers(self.lat, 6),
+                self._json_numbers(self.lng, 6),
+                self._json_numbers(self.speed, 1),
+                self._json_numbers(self.fuel, 1),
+                self._json_numbers(self.engine_hours, 1),
+                [MODE_JSON_NAMES[mode] for mode in self.mode.tolist()],
+                repeat(b'%d' % timestamp)
+            ))
+        ]
+        
+    @staticmethod
+    def _json_numbers(column: np.ndarray, decimals: int) -> List[bytes]:
+        """Round a column and JSON-encode each value (same text as orjson gives a float)"""
+        rounded = np.ascontiguousarray(np.round(column, decimals))
+        return orjson.dumps(rounded, option=orjson.OPT_SERIALIZE_NUMPY)[1:-1].split(b',')
+        
+    def get_binary_records(self, timestamp: int) -> np.ndarray:
+        """Generate one BINARY_RECORD per machine, stamped with `timestamp` (Unix ms)"""
+        records = np.zeros(len(self), dtype=BINARY_RECORD)
+        records['id'] = self.ids
+        records['temp'] = self.temp
+        records['vib'] = self.vib
+        records['gps'] = np.column_stack([self.lat, self.lng])
+        records['speed'] = self.speed
+        records['fuel_level'] = self.fuel
+        records['engine_hours'] = self.engine_hours
+        records['mode'] = self.mode
+        records['timestamp'] = timestamp
+        return records
 
 
 class Simulator:
     """Main simulator orchestrating all virtual machines"""
     
     def __init__(self, num_machines: int = 50):
-        self.machines: List[VirtualMachine] = []
         self.running = False
-        self.client: Optional[mqtt.Client] = None
+        self.clients: List[mqtt.Client] = []
         
         # Create virtual machines
-        for i in range(num_machines):
-            machine_id = f"sim_{str(i + 1).zfill(3)}"
-            self.machines.append(VirtualMachine(machine_id))
+        self.fleet = Fleet(num_machines)
             
         print(f"🚜 Created {num_machines} virtual machines")
         
     def connect_mqtt(self):
-        """Connect to MQTT broker"""
+        """Connect MQTT_CLIENTS clients to the MQTT broker"""
+        self.disconnect_mqtt()
+        try:
+            for index in range(MQTT_CLIENTS):
+                client = self._make_client(index)
+                client.connect(MQTT_BROKER, MQTT_PORT, 60)
+                client.loop_start()
+                self.clients.append(client)
+            return True
+        except Exception as e:
+            print(f"❌ MQTT connection error: {e}")
+            self.disconnect_mqtt()
+            return False
+            
+    def disconnect_mqtt(self):
+        """Stop and disconnect every MQTT client"""
+        for client in self.clients:
+            client.loop_stop()
+            client.disconnect()
+        self.clients = []
+        
+    def _make_client(self, index: int) -> mqtt.Client:
+        """Create MQTT client `index` (not yet connected)"""
         # Use CallbackAPIVersion.VERSION2 for paho-mqtt v2.0+
-        self.client = mqtt.Client(
+        client = mqtt.Client(
             callback_api_version=mqtt.CallbackAPIVersion.VERSION2,
-            client_id=f"simulator_{int(time.time())}"
+            client_id=f"simulator_{int(time.time())}_{index}"
         )
         
         def on_connect(client, userdata, flags, reason_code, properties):
             if reason_code == 0:
-                print(f"✅ Connected to MQTT broker at {MQTT_BROKER}:{MQTT_PORT}")
+                print(f"✅ Client {index} connected to MQTT broker at {MQTT_BROKER}:{MQTT_PORT}")
+                self._tune_socket(client.socket())
             else:
-                print(f"❌ Failed to connect, return code {reason_code}")
+                print(f"❌ Client {index} failed to connect, return code {reason_code}")
                 
         def on_disconnect(client, userdata, flags, reason_code, properties):
-            print(f"🔌 Disconnected from MQTT broker (rc={reason_code})")
+            print(f"🔌 Client {index} disconnected from MQTT broker (rc={reason_code})")
             
-        self.client.on_connect = on_connect
-        self.client.on_disconnect = on_disconnect
+        client.on_connect = on_connect
+        client.on_disconnect = on_disconnect
+        
+        # With QoS 1, keep a whole fleet's messages in flight rather than paho's
+        # default 20, so publishes never queue behind outstanding PUBACKs
+        client.max_inflight_messages_set(1000)
+        client.max_queued_messages_set(0)  # 0 = unbounded queue
+        return client
         
+    @staticmethod
+    def _tune_socket(sock):
+        """Send small publishes immediately (no Nagle delay) and give the kernel a 1 MiB send buffer"""
         try:
-            self.client.connect(MQTT_BROKER, MQTT_PORT, 60)
-            self.client.loop_start()
-            return True
-        except Exception as e:
-            print(f"❌ MQTT connection error: {e}")
-            return False
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 1 << 20)
+        except (AttributeError, OSError) as e:
+            # Not a plain TCP socket (e.g. websockets transport) - keep the defaults
+            print(f"⚠️ Could not tune MQTT socket: {e}")
             
     def publish_all(self):
-        """Publish state of all machines"""
-        for machine in self.machines:
-            machine.update()
-            payload = machine.get_payload()
-            
-            self.client.publish(
-                MQTT_TOPIC,
-                json.dumps(payload),
-                qos=1
-            )
+        """
+        Publish state of all machines (one message each, or one batch message with MQTT_BATCH).
+        
+        publish() only queues the message; paho's network thread (loop_start)
+        does the socket writes, so encoding the next messages already overlaps
+        sending the previous ones. Encoding is a few ms for thousands of
+        machines and holds the GIL, so it stays on this thread.
+        
+        Every message gets its own bytes object rather than a slice of one
+        reused scratch buffer: paho copies the payload into its outgoing packet
+        and, for QoS 1, keeps a reference to it for retransmission, so a buffer
+        overwritten on the next tick could be resent with the wrong contents.
+        Batching is the way to fewer allocations - one payload per tick.
+        
+        Messages are dealt round-robin over the clients, so machine i always
+        goes out on connection i % MQTT_CLIENTS and keeps its per-machine order.
+        """
+        self.fleet.update()
+        # One timestamp for the whole tick, as integer milliseconds
+        timestamp = time.time_ns() // 1_000_000
+        
+        if MQTT_PAYLOAD_FORMAT == 'binary':
+            # One record per message, or all records back to back for a batch
+            topic = f"{MQTT_TOPIC}/bin"
+            data = self.fleet.get_binary_records(timestamp).tobytes()
+            size = BINARY_RECORD.itemsize
+            messages = [data] if MQTT_BATCH else [data[i:i + size] for i in range(0, len(data), size)]
+        else:
+            # UTF-8 JSON bytes, which paho sends as-is; a batch is the same objects as one array
+            topic = MQTT_TOPIC
+            payloads = self.fleet.get_json_payloads(timestamp)
+            messages = [b'[%b]' % b','.join(payloads)] if MQTT_BATCH else payloads
+        
+        if MQTT_BATCH:
+            # One frame (and one PUBACK) per tick instead of one per machine
+            topic = f"{topic}/batch"
+        
+        for message, client in zip(messages, cycle(self.clients)):
+            client.publish(topic, message, qos=MQTT_QOS)
             
     def run(self):
         """Main simulation loop"""
@@ -268,32 +440,34 @@ class Simulator:
                 
         self.running = True
         print(f"🚀 Simulator running - Publishing to {MQTT_TOPIC}")
-        print(f"   Interval: {PUBLISH_INTERVAL}s | Machines: {len(self.machines)}")
+        print(f"   Interval: {PUBLISH_INTERVAL}s | Machines: {len(self.fleet)} | Connections: {len(self.clients)}")
         print("-" * 50)
         
         tick = 0
+        # Ticks are scheduled on a fixed monotonic grid, so the time spent
+        # updating and publishing doesn't push every later tick back. After a
+        # stall (slow broker, suspend) the grid restarts from now: missed ticks
+        # are skipped, not published back to back
+        next_tick = time.monotonic()
         try:
             while self.running:
                 self.publish_all()
                 tick += 1
                 
                 if tick % 10 == 0:  # Status every 10 ticks
-                    active = sum(1 for m in self.machines if m.mode == 'active')
-                    idle = sum(1 for m in self.machines if m.mode == 'idle')
-                    off = sum(1 for m in self.machines if m.mode == 'off')
-                    overheat = sum(1 for m in self.machines if m.mode == 'overheat')
+                    # Machines per mode code in one pass
+                    active, idle, off, overheat = np.bincount(self.fleet.mode, minlength=len(Mode)).tolist()
                     print(f"📊 Tick {tick}: Active={active} | Idle={idle} | Off={off} | Overheat={overheat}")
                     
-                time.sleep(PUBLISH_INTERVAL)
+                next_tick = max(next_tick + PUBLISH_INTERVAL, time.monotonic())
+                time.sleep(max(0, next_tick - time.monotonic()))
                 
         except KeyboardInterrupt:
             print("\n🛑 Stopping simulator...")
             
         finally:
             self.running = False
-            if self.client:
-                self.client.loop_stop()
-                self.client.disconnect()
+            self.disconnect_mqtt()
             print("👋 Simulator stopped")
             
     def stop(self):